@@ -1,5 +1,7 @@
 from queue import Queue
 import copy
+import os
+import time
 
 
 class Graph:
@@ -19,6 +21,11 @@ class Graph:
             if "s" in row:
                 return row.index("s"), y
 
+    def get_goal_coords(self) -> tuple:
+        for y, row in enumerate(self.map):
+            if "D" in row:
+                return row.index("D"), y
+
     def neighbors(self, coords: tuple) -> list:
         """Get all okay to visit neighboring coordinates."""
         x = coords[0]
@@ -63,29 +70,41 @@ class Graph:
         return "\n".join(["".join(row) for row in map])
 
 
-def bfs(graph: Graph, start: tuple):
-    """Do breath first to find the Diamond (D) and print visited coordinates as a map."""
+def bfs(graph: Graph, start: tuple, bidirectional: bool = False, display: bool = True, stats: dict = None):
+    """Do breath first to find the Diamond (D) and print visited coordinates as a map.
+
+    With bidirectional=True the search runs from both the start and the Diamond and stops where they meet.
+    Number of expanded coordinates is written to stats["expanded"] if stats is given.
+    """
     if start is None:
         return
+    if bidirectional:
+        return bidirectional_bfs(graph, start, graph.get_goal_coords(), display, stats)
 
     frontier = Queue()
     frontier.put(start)
     came_from = {start: None}
     current = None
+    expanded = 0
 
     while not frontier.empty():
         current = frontier.get()
+        expanded += 1
 
         if graph.get_current(current) == "D":
             break
 
-        graph.display_visited(current)
+        if display:
+            graph.display_visited(current)
 
         for next in graph.neighbors(current):
             if next not in came_from:
                 frontier.put(next)
                 came_from[next] = current
 
+    if stats is not None:
+        stats["expanded"] = expanded
+
     path = []
     while current != start:
         path.append(current)
@@ -94,14 +113,98 @@ def bfs(graph: Graph, start: tuple):
     return path[::-1]
 
 
-def find_and_display_path(map: list):
+def bidirectional_bfs(graph: Graph, start: tuple, goal: tuple, display: bool = True, stats: dict = None):
+    """Meet in the middle BFS, expands one whole layer of the smaller side at a time.
+
+    The first coordinate reached by both sides lies on a shortest path. Returns None if there is no path.
+    """
+    if goal is None:
+        return
+    came_from = {start: None}  # parents towards the start
+    came_to = {goal: None}  # parents towards the Diamond
+    forward = [start]
+    backward = [goal]
+    meeting = start if start == goal else None
+    expanded = 0
+
+    while meeting is None and forward and backward:
+        if len(forward) <= len(backward):
+            layer, parents, others = forward, came_from, came_to
+        else:
+            layer, parents, others = backward, came_to, came_from
+
+        next_layer = []
+        for current in layer:
+            expanded += 1
+            if display:
+                graph.display_visited(current)
+            for next in graph.neighbors(current):
+                if next not in parents:
+                    parents[next] = current
+                    next_layer.append(next)
+                    if next in others:
+                        meeting = next
+                        break
+            if meeting is not None:
+                break
+
+        if layer is forward:
+            forward = next_layer
+        else:
+            backward = next_layer
+
+    if stats is not None:
+        stats["expanded"] = expanded
+    if meeting is None:
+        return
+
+    path = []
+    current = meeting
+    while current is not None:
+        path.append(current)
+        current = came_from[current]
+    path.reverse()
+    current = came_to[meeting]
+    while current is not None:
+        path.append(current)
+        current = came_to[current]
+    return path
+
+
+def find_and_display_path(map: list, bidirectional: bool = False):
     """Do BFS and display the path."""
     graph = Graph(map)
     start = graph.get_start_coords()
-    path = bfs(graph, start)
+    path = bfs(graph, start, bidirectional)
     graph.display_path(path)
 
 
+def compare_bfs(files: list):
+    """Compare path length, expanded coordinates and time of forward and bidirectional BFS on cave files."""
+    len1 = 16
+    len2 = 6
+    len3 = 8
+    for file in files:
+        if not os.path.exists(file):
+            print(f"{file} file not found!\n")
+            continue
+        title = f"Map: {file}"
+        print(title)
+        print("-" * len(title))
+        with open(file) as f:
+            map_data = [l.strip() for l in f.readlines() if len(l) > 1]
+            graph = Graph(map_data)
+
+            for name, bidirectional in [("BFS:", False), ("Bidir BFS:", True)]:
+                stats = {}
+                start = time.time()
+                path = bfs(graph, graph.get_start_coords(), bidirectional, display=False, stats=stats)
+                end = time.time()
+                print(f"{name: <{len1}} {len(path) : <{len2}} expanded: {stats['expanded'] : <{len3}} "
+                      f"time:  {round(end - start, 4)} s")
+            print()
+
+
 lava_map1 = [
     "      **               **      ",
     "     ***     D        ***      ",
@@ -138,5 +241,7 @@ lava_map2 = [
     "                s              ",
 ]
 
-find_and_display_path(lava_map2)
+if __name__ == '__main__':
+    find_and_display_path(lava_map2)
+    # compare_bfs(["../hw2/cave300x300", "../hw2/cave600x600", "../hw2/cave900x900"])
 
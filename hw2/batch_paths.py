@@ -0,0 +1,105 @@
+import os
+import time
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from path_finding_greedy_astar import Graph, VARIANTS, path_finding
+
+# graph of the worker process, built once on top of the shared grid
+worker_graph = None
+worker_memory = None
+
+
+def init_worker(memory_name: str, shape: tuple) -> None:
+    """Attach worker to the shared grid."""
+    global worker_graph, worker_memory
+    worker_memory = SharedMemory(name=memory_name)
+    grid = np.ndarray(shape, dtype=np.uint8, buffer=worker_memory.buf)
+    worker_graph = Graph.from_grid(grid)
+
+
+def run_query(task: tuple) -> tuple:
+    """Find path for one (index, start, goal, mode) task in a worker, None if there is no path."""
+    index, start, goal, mode = task
+    graph = worker_graph
+    graph.start = start
+    graph.goal = goal
+    stats = {}
+    begin = time.perf_counter()
+    if graph.is_not_lava(start) and graph.is_not_lava(goal):
+        path = path_finding(graph, stats=stats, **VARIANTS[mode])
+    else:
+        path = None
+    stats["time"] = time.perf_counter() - begin
+    return index, path, stats
+
+
+def find_paths(graph: Graph, queries: list, processes: int = None, chunksize: int = 1):
+    """Find paths for many (start, goal, mode) queries on one map using a process pool.
+
+    mode is a name in VARIANTS, start and goal are (x, y) coordinates.
+    The grid is copied once to shared memory, so tasks only carry the query itself.
+    Yields (index of the query, path, stats) in the order the queries complete,
+    path is None if start or goal is lava or there is no path between them.
+    """
+    for _, _, mode in queries:
+        if mode not in VARIANTS:
+            raise ValueError(f"Unknown mode: {mode}")
+
+    memory = SharedMemory(create=True, size=graph.grid.nbytes)
+    try:
+        shared_grid = np.ndarray(graph.grid.shape, dtype=np.uint8, buffer=memory.buf)
+        shared_grid[:] = graph.grid
+        tasks = [(i, start, goal, mode) for i, (start, goal, mode) in enumerate(queries)]
+        with Pool(processes, initializer=init_worker, initargs=(memory.name, graph.grid.shape)) as pool:
+            yield from pool.imap_unordered(run_query, tasks, chunksize)
+        del shared_grid
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def random_queries(graph: Graph, n: int, modes: list, seed: int = 0) -> list:
+    """Get n queries between random passable cells, every pair is asked with all given modes."""
+    rng = np.random.default_rng(seed)
+    cells = np.flatnonzero(graph.passable)
+    queries = []
+    for start, goal in rng.choice(cells, size=(n, 2)):
+        for mode in modes:
+            queries.append((graph.to_coords(int(start)), graph.to_coords(int(goal)), mode))
+    return queries
+
+
+def compare_batch(file: str, n: int = 20, modes: list = None, processes: int = None):
+    """Run the same random queries serially and with the process pool and print the wall time of both."""
+    if not os.path.exists(file):
+        print(f"{file} file not found!\n")
+        return
+    graph = Graph.from_file(file)
+    modes = modes or ["A* not-diag [h1]", "A* diag [h2]", "JPS diag [h2]"]
+    queries = random_queries(graph, n, modes)
+
+    start = time.perf_counter()
+    for query_start, query_goal, mode in queries:
+        graph.start = query_start
+        graph.goal = query_goal
+        path_finding(graph, **VARIANTS[mode])
+    serial_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    done = 0
+    for index, path, stats in find_paths(graph, queries, processes):
+        done += 1
+        print(f"\r{done}/{len(queries)} queries done", end="")
+    pool_time = time.perf_counter() - start
+
+    print(f"\rMap: {file}, {len(queries)} queries")
+    print(f"serial: {round(serial_time, 4)} s")
+    print(f"pool:   {round(pool_time, 4)} s ({processes or os.cpu_count()} processes)\n")
+
+
+if __name__ == '__main__':
+    compare_batch("cave300x300")
+    compare_batch("cave600x600")
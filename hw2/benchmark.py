@@ -0,0 +1,156 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from path_finding_greedy_astar import Graph, VARIANTS, path_finding
+from cave_generator import generate_cave
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "hw1"))
+import pathfinding_BFS  # noqa: E402
+
+
+def hw1_bfs(rows: list):
+    """Get function running hw1 BFS on the map, graph building is done before timing."""
+    graph = pathfinding_BFS.Graph(rows)
+    start = graph.get_start_coords()
+
+    def run(stats: dict) -> list:
+        return pathfinding_BFS.bfs(graph, start, display=False, stats=stats)
+    return run
+
+
+def hw2_variant(rows: list, options: dict):
+    """Get function running one hw2 path_finding variant on the map."""
+    graph = Graph(rows)
+
+    def run(stats: dict) -> list:
+        return path_finding(graph, stats=stats, **options)
+    return run
+
+
+def measure(run, repeat: int = 5, warmup: int = 1) -> dict:
+    """Time run with perf_counter after warmup runs, then do one extra run under tracemalloc for peak memory."""
+    for _ in range(warmup):
+        run({})
+    times = []
+    stats = {}
+    path = None
+    for _ in range(repeat):
+        stats = {}
+        start = time.perf_counter()
+        path = run(stats)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    run({})
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "path_length": len(path) if path is not None else None,
+        "expanded": stats.get("expanded"),
+        "time_min": min(times),
+        "time_median": statistics.median(times),
+        "times": times,
+        "peak_memory": peak,
+    }
+
+
+def run_benchmark(sizes: list, density: float = 0.45, seed: int = 0, repeat: int = 5, warmup: int = 1,
+                  algorithms: list = None) -> dict:
+    """Benchmark hw1 BFS and hw2 variants on generated caves of the given sizes."""
+    algorithms = algorithms or ["BFS (hw1)"] + list(VARIANTS)
+    results = []
+    maps = []
+    for size in sizes:
+        rows = generate_cave(size, size, density, seed)
+        name = f"cave{size}x{size}-d{density}-s{seed}"
+        maps.append({"name": name, "width": size, "height": size, "lava_density": density, "seed": seed})
+        for algorithm in algorithms:
+            run = hw1_bfs(rows) if algorithm == "BFS (hw1)" else hw2_variant(rows, VARIANTS[algorithm])
+            result = measure(run, repeat, warmup)
+            result.update(map=name, algorithm=algorithm)
+            results.append(result)
+            print(f"{name: <24} {algorithm: <24} {result['path_length'] : <6} expanded: {result['expanded'] : <8} "
+                  f"median: {round(result['time_median'], 4)} s  peak: {result['peak_memory'] // 1024} KiB")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "repeat": repeat,
+            "warmup": warmup,
+        },
+        "maps": maps,
+        "results": results,
+    }
+
+
+def compare(old: dict, new: dict, tolerance: float = 0.1) -> list:
+    """Get regressions of new results against old ones.
+
+    Median time above old * (1 + tolerance), more expanded nodes and a changed path length are regressions.
+    """
+    old_results = {(r["map"], r["algorithm"]): r for r in old["results"]}
+    regressions = []
+    for result in new["results"]:
+        key = (result["map"], result["algorithm"])
+        if key not in old_results:
+            continue
+        before = old_results[key]
+        if result["time_median"] > before["time_median"] * (1 + tolerance):
+            regressions.append((key, "time_median", before["time_median"], result["time_median"]))
+        if (result["expanded"] or 0) > (before["expanded"] or 0):
+            regressions.append((key, "expanded", before["expanded"], result["expanded"]))
+        if result["path_length"] != before["path_length"]:
+            regressions.append((key, "path_length", before["path_length"], result["path_length"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Path finding benchmark on generated caves.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run benchmark and write results as JSON")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=[300, 600, 900])
+    run_parser.add_argument("--density", type=float, default=0.45)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--warmup", type=int, default=1)
+    run_parser.add_argument("--algorithms", nargs="+", help="default: BFS (hw1) and all hw2 variants")
+    run_parser.add_argument("-o", "--output", default="benchmark.json")
+
+    compare_parser = subparsers.add_parser("compare", help="compare two JSON results, exit code 1 on regressions")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--tolerance", type=float, default=0.1)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        results = run_benchmark(args.sizes, args.density, args.seed, args.repeat, args.warmup, args.algorithms)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    else:
+        with open(args.old) as f:
+            old = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+        regressions = compare(old, new, args.tolerance)
+        for (map_name, algorithm), field, before, after in regressions:
+            print(f"REGRESSION {map_name} {algorithm}: {field} {before} -> {after}")
+        if not regressions:
+            print("No regressions")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
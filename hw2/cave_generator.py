@@ -0,0 +1,61 @@
+import sys
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from path_finding_greedy_astar import Graph
+from landmarks import bfs_distances
+
+
+def generate_cave(width: int, height: int, lava_density: float = 0.45, seed: int = 0, smoothing: int = 4) -> list:
+    """Generate a cave map as list of row strings in the same format as the cave files.
+
+    Cells start as lava with probability lava_density and are then smoothed by a cellular automaton
+    (a cell becomes lava if at least 5 cells of its 3x3 block are lava), smoothing=0 keeps plain noise.
+    The map has a lava border, 's' near the top left corner and 'D' as far to the bottom right
+    as the start's connected area reaches, so there is always a path.
+    """
+    rng = np.random.default_rng(seed)
+    lava = rng.random((height, width)) < lava_density
+    for _ in range(smoothing):
+        padded = np.pad(lava, 1, constant_values=True)
+        lava = sliding_window_view(padded, (3, 3)).sum(axis=(2, 3)) >= 5
+    lava[0, :] = lava[-1, :] = lava[:, 0] = lava[:, -1] = True
+
+    cells = np.where(lava, ord("*"), ord(" ")).astype(np.uint8)
+    graph = Graph.from_grid(np.pad(cells.T, 1, constant_values=ord("*")))
+
+    # try starts from the top left corner until one lies in an area covering a good part of the cave
+    free_cells = np.flatnonzero(graph.passable)
+    if free_cells.size < 2:
+        raise ValueError("Cave has no room for start and goal, lower the lava density")
+    x, y = np.divmod(free_cells, graph.stride)
+    candidates = free_cells[np.argsort(x + y, kind="stable")]
+    for start in candidates[:1000]:
+        distances = bfs_distances(graph, int(start), is_diagonal=False)
+        reachable = np.flatnonzero(distances > 0)
+        if reachable.size >= free_cells.size // 4:
+            break
+    if reachable.size == 0:
+        raise ValueError("Cave has no connected room for start and goal, lower the lava density")
+    goal = int(reachable[np.argmax(np.sum(np.divmod(reachable, graph.stride), axis=0))])
+
+    sx, sy = graph.to_coords(int(start))
+    gx, gy = graph.to_coords(goal)
+    cells[sy, sx] = ord("s")
+    cells[gy, gx] = ord("D")
+    return [row.tobytes().decode() for row in cells]
+
+
+def save_cave(rows: list, file: str) -> None:
+    """Write cave rows to file, one row per line."""
+    with open(file, "w") as f:
+        f.write("\n".join(rows) + "\n")
+
+
+if __name__ == '__main__':
+    # python cave_generator.py WIDTH HEIGHT FILE [LAVA_DENSITY] [SEED]
+    width, height, file = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3]
+    density = float(sys.argv[4]) if len(sys.argv) > 4 else 0.45
+    seed = int(sys.argv[5]) if len(sys.argv) > 5 else 0
+    save_cave(generate_cave(width, height, density, seed), file)
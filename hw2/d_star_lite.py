@@ -0,0 +1,200 @@
+import os
+import random
+import time
+
+from cave_generator import generate_cave
+from path_finding_greedy_astar import Graph, OpenSet, path_finding
+from landmarks import bfs_distances
+
+INFINITY = float("inf")
+
+
+class DStarLite:
+
+    # D* Lite searches backwards from the goal to the start and keeps for every node
+    # g (cost found so far) and rhs (one step lookahead from the neighbors' g).
+    # nodes with g != rhs are inconsistent and wait in the open set; after a cell changes only the
+    # neighborhood of that cell becomes inconsistent, so the next search repairs just that region.
+    # expanding a node changes only its own g, so rhs of its neighbors is updated from that g and only
+    # neighbors whose rhs came from the node's old g look at all their neighbors again.
+
+    def __init__(self, graph: Graph, is_diagonal: bool = False, h1: bool = True):
+        """Class constructor."""
+        self.graph = graph
+        self.offsets = graph.diagonal_offsets if is_diagonal else graph.offsets
+        self.h1 = h1
+        self.start = graph.to_id(graph.start)
+        self.goal = graph.to_id(graph.goal)
+        self.start_x, self.start_y = divmod(self.start, graph.stride)
+
+        # flat lists indexed by node id, like the passable cells
+        self.g = [INFINITY] * len(graph.passable_cells)
+        self.rhs = [INFINITY] * len(graph.passable_cells)
+        self.rhs[self.goal] = 0
+        self.frontier = OpenSet()
+        self.frontier.push(self.goal, *self.key(self.goal))
+
+    def key(self, node: int) -> tuple:
+        """Get priority of node in the open set as (f, g)."""
+        cost = min(self.g[node], self.rhs[node])
+        x, y = divmod(node, self.graph.stride)
+        dx, dy = abs(x - self.start_x), abs(y - self.start_y)
+        return cost + (dx + dy if self.h1 else max(dx, dy)), cost
+
+    def update_node(self, node: int) -> None:
+        """Recompute rhs of node and put it in the open set if it became inconsistent."""
+        passable = self.graph.passable_cells
+        g = self.g
+        if node != self.goal:
+            rhs = INFINITY
+            if passable[node]:
+                for offset in self.offsets:
+                    if passable[node + offset] and g[node + offset] + 1 < rhs:
+                        rhs = g[node + offset] + 1
+            self.rhs[node] = rhs
+        self.update_open(node)
+
+    def update_open(self, node: int) -> None:
+        """Put node in the open set if it is inconsistent, remove it otherwise."""
+        if self.g[node] != self.rhs[node]:
+            self.frontier.push(node, *self.key(node))
+        else:
+            self.frontier.remove(node)
+
+    def compute_shortest_path(self) -> int:
+        """Process inconsistent nodes until the start is consistent, returns the number of expanded nodes."""
+        passable = self.graph.passable_cells
+        offsets = self.offsets
+        frontier = self.frontier
+        key = self.key
+        g = self.g
+        rhs = self.rhs
+        start = self.start
+        expanded = 0
+        while not frontier.is_empty():
+            old_key = frontier.min_key()
+            # the heuristic of the start is 0, so its key is (cost, cost)
+            start_cost = min(g[start], rhs[start])
+            if old_key >= (start_cost, start_cost) and rhs[start] == g[start]:
+                break
+
+            # the start never moves, so keys in the open set are never outdated (no k_m of D* Lite)
+            node = frontier.pop()
+            expanded += 1
+            node_g = g[node]
+            node_rhs = rhs[node]
+            if node_g > node_rhs:
+                g[node] = node_rhs
+                cost = node_rhs + 1
+                for offset in offsets:
+                    neighbor = node + offset
+                    if passable[neighbor] and cost < rhs[neighbor]:
+                        rhs[neighbor] = cost
+                        if g[neighbor] != cost:
+                            frontier.push(neighbor, *key(neighbor))
+                        else:
+                            frontier.remove(neighbor)
+            else:
+                g[node] = INFINITY
+                self.update_open(node)
+                cost = node_g + 1
+                for offset in offsets:
+                    neighbor = node + offset
+                    if passable[neighbor] and rhs[neighbor] == cost:
+                        self.update_node(neighbor)
+        return expanded
+
+    def set_cell(self, x: int, y: int, is_lava: bool) -> None:
+        """Open or close a cell, the next find_path repairs the previous search instead of starting over."""
+        self.graph.set_cell(x, y, is_lava)
+        node = self.graph.to_id((x, y))
+        self.update_node(node)
+        for offset in self.offsets:
+            self.update_node(node + offset)
+
+    def find_path(self, stats: dict = None) -> list:
+        """Get path from the start to the goal in the same format as path_finding, None if there is no path.
+
+        Number of expanded nodes is written to stats["expanded"] if stats is given.
+        """
+        expanded = self.compute_shortest_path()
+        if stats is not None:
+            stats["expanded"] = expanded
+        if self.g[self.start] == INFINITY:
+            return
+
+        passable = self.graph.passable_cells
+        path = []
+        current = self.start
+        while current != self.goal:
+            path.append(self.graph.to_coords(current))
+            current = min([current + o for o in self.offsets if passable[current + o]],
+                          key=lambda n: self.g[n])
+        return path[::-1]
+
+
+def check_random_edits(cave, edits: int = 100, batch: int = 5, is_diagonal: bool = False, h1: bool = True,
+                       seed: int = 0) -> None:
+    """Apply random lava edits and check after every batch that D* Lite agrees with a fresh A* search.
+
+    cave is a map file or a list of rows, for example from cave_generator.generate_cave.
+    Half of the edits block a cell of the current path, the rest flip a random cell.
+    Prints how many nodes both needed to expand in total.
+    """
+    if isinstance(cave, str):
+        if not os.path.exists(cave):
+            print(f"{cave} file not found!\n")
+            return
+        graph = Graph.from_file(cave)
+        name = cave
+    else:
+        graph = Graph(cave)
+        name = f"generated {graph.width}x{graph.height}"
+    planner = DStarLite(graph, is_diagonal, h1)
+    rng = random.Random(seed)
+
+    incremental_expanded = fresh_expanded = 0
+    incremental_time = fresh_time = 0
+    path = planner.find_path()
+    for i in range(0, edits, batch):
+        for _ in range(batch):
+            if path and rng.random() < 0.5:
+                (x, y), is_lava = rng.choice(path), True
+            else:
+                x, y, is_lava = rng.randrange(graph.width), rng.randrange(graph.height), rng.random() < 0.5
+            if (x, y) not in (graph.start, graph.goal):
+                planner.set_cell(x, y, is_lava)
+
+        stats = {}
+        start = time.perf_counter()
+        path = planner.find_path(stats)
+        incremental_time += time.perf_counter() - start
+        incremental_expanded += stats["expanded"]
+
+        stats = {}
+        start = time.perf_counter()
+        fresh_path = path_finding(graph, is_astar=True, is_diagonal=is_diagonal, h1=h1, stats=stats)
+        fresh_time += time.perf_counter() - start
+        fresh_expanded += stats["expanded"]
+
+        reachable = bfs_distances(graph, graph.to_id(graph.start), is_diagonal)[graph.to_id(graph.goal)] >= 0
+        if not reachable:
+            assert path is None, f"Edit {i}: D* Lite found a path, but there is none"
+        else:
+            assert path is not None and len(path) == len(fresh_path), \
+                f"Edit {i}: D* Lite path {None if path is None else len(path)}, A* path {len(fresh_path)}"
+
+    print(f"Map: {name}, {edits} edits in batches of {batch}, all paths match A*")
+    print(f"D* Lite: expanded {incremental_expanded: <9} time: {round(incremental_time, 4)} s")
+    print(f"A*:      expanded {fresh_expanded: <9} time: {round(fresh_time, 4)} s\n")
+
+
+if __name__ == '__main__':
+    # small generated caves need no map files
+    for seed in range(5):
+        check_random_edits(generate_cave(60, 60, seed=seed), edits=200, batch=3, seed=seed)
+        check_random_edits(generate_cave(60, 60, seed=seed), edits=200, batch=3, is_diagonal=True, h1=False,
+                           seed=seed)
+    check_random_edits("cave300x300")
+    check_random_edits("cave300x300", is_diagonal=True, h1=False)
+    check_random_edits("cave600x600")
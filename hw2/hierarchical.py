@@ -0,0 +1,329 @@
+import os
+import time
+from collections import deque
+
+from path_finding_greedy_astar import Graph, OpenSet, path_finding
+
+
+class ClusterGraph:
+
+    # HPA*: the map is cut into cluster_size x cluster_size clusters.
+    # cells on both sides of a passable run on a cluster border are entrances (the middle pair for short runs,
+    # both end pairs for long ones), they are linked with cost 1 across the border and with cached BFS
+    # distances to the other entrances of the same cluster.
+    # with diagonal moves a diagonal step crossing a border or a cluster corner is an entrance too, when the two
+    # cells it cuts past are lava (otherwise the crossing already goes through an orthogonal entrance).
+    # a query links start and goal to the entrances of their clusters, searches the small abstract graph
+    # and refines every abstract edge with a local search inside one cluster.
+
+    def __init__(self, graph: Graph, cluster_size: int = 16, is_diagonal: bool = False):
+        """Class constructor."""
+        self.graph = graph
+        self.cluster_size = cluster_size
+        self.is_diagonal = is_diagonal
+        self.clusters_x = (graph.width + cluster_size - 1) // cluster_size
+        self.clusters_y = (graph.height + cluster_size - 1) // cluster_size
+
+        self.border_entrances = {}  # (cluster, cluster) -> list of (node, node) pairs linked across the border
+        self.cluster_edges = {}  # cluster -> {entrance node: {entrance node: distance}}
+        self.inter_edges = {}  # entrance node -> set of entrance nodes in the neighboring clusters
+
+        for cluster in self.clusters():
+            for other in self.next_clusters(cluster):
+                self.build_border(cluster, other)
+        self.build_inter_edges()
+        for cluster in self.clusters():
+            self.build_cluster(cluster)
+
+    def clusters(self) -> list:
+        """Get all clusters as (cx, cy)."""
+        return [(cx, cy) for cx in range(self.clusters_x) for cy in range(self.clusters_y)]
+
+    def next_clusters(self, cluster: tuple) -> list:
+        """Get the clusters right, below (and right corners if diagonal) of cluster, visiting every border once."""
+        cx, cy = cluster
+        candidates = [(cx + 1, cy), (cx, cy + 1)]
+        if self.is_diagonal:
+            candidates += [(cx + 1, cy + 1), (cx + 1, cy - 1)]
+        return [c for c in candidates if c[0] < self.clusters_x and 0 <= c[1] < self.clusters_y]
+
+    def around(self, cluster: tuple) -> list:
+        """Get the clusters sharing a border (or a corner if diagonal) with cluster."""
+        cx, cy = cluster
+        return [(cx + dx, cy + dy) for dx in [-1, 0, 1] for dy in [-1, 0, 1]
+                if (dx or dy) and (self.is_diagonal or not (dx and dy))
+                and 0 <= cx + dx < self.clusters_x and 0 <= cy + dy < self.clusters_y]
+
+    def cluster_of(self, node: int) -> tuple:
+        """Get cluster containing node id."""
+        x, y = self.graph.to_coords(node)
+        return x // self.cluster_size, y // self.cluster_size
+
+    def bounds(self, cluster: tuple) -> tuple:
+        """Get (x0, y0, x1, y1) map coordinates covered by the cluster, x1 and y1 exclusive."""
+        x0 = cluster[0] * self.cluster_size
+        y0 = cluster[1] * self.cluster_size
+        return x0, y0, min(x0 + self.cluster_size, self.graph.width), min(y0 + self.cluster_size, self.graph.height)
+
+    def diagonal_entrance(self, a: tuple, b: tuple):
+        """Get (node, node) of diagonal neighbors a and b if only the diagonal step links them, else None."""
+        graph = self.graph
+        if (graph.is_not_lava(a) and graph.is_not_lava(b)
+                and not graph.is_not_lava((a[0], b[1])) and not graph.is_not_lava((b[0], a[1]))):
+            return graph.to_id(a), graph.to_id(b)
+        return None
+
+    def build_border(self, cluster: tuple, other: tuple) -> None:
+        """Find entrances on the border between cluster and a cluster from next_clusters."""
+        graph = self.graph
+        x0, y0, x1, y1 = self.bounds(cluster)
+        if other[0] != cluster[0] and other[1] != cluster[1]:
+            # clusters touching at a corner, only the diagonal step between the corner cells crosses it
+            if other[1] > cluster[1]:
+                pair = self.diagonal_entrance((x1 - 1, y1 - 1), (x1, y1))
+            else:
+                pair = self.diagonal_entrance((x1 - 1, y0), (x1, y0 - 1))
+            self.border_entrances[(cluster, other)] = [pair] if pair else []
+            return
+        if other[0] != cluster[0]:
+            cells = [((x1 - 1, y), (x1, y)) for y in range(y0, y1)]
+        else:
+            cells = [((x, y1 - 1), (x, y1)) for x in range(x0, x1)]
+
+        entrances = []
+        run = []
+        for a, b in cells + [(None, None)]:
+            if a is not None and graph.is_not_lava(a) and graph.is_not_lava(b):
+                run.append((graph.to_id(a), graph.to_id(b)))
+                continue
+            if len(run) >= 6:
+                entrances += [run[0], run[-1]]
+            elif run:
+                entrances.append(run[len(run) // 2])
+            run = []
+        if self.is_diagonal:
+            for (a0, b0), (a1, b1) in zip(cells, cells[1:]):
+                entrances += [pair for pair in [self.diagonal_entrance(a0, b1), self.diagonal_entrance(a1, b0)]
+                              if pair]
+        self.border_entrances[(cluster, other)] = entrances
+
+    def build_inter_edges(self) -> None:
+        """Link entrance pairs of all borders."""
+        self.inter_edges = {}
+        for entrances in self.border_entrances.values():
+            self.link(entrances)
+
+    def link(self, entrances: list) -> None:
+        """Add entrance pairs of one border to inter_edges."""
+        for a, b in entrances:
+            self.inter_edges.setdefault(a, set()).add(b)
+            self.inter_edges.setdefault(b, set()).add(a)
+
+    def unlink(self, entrances: list) -> None:
+        """Remove entrance pairs of one border from inter_edges, every pair belongs to a single border."""
+        for a, b in entrances:
+            for node, other in [(a, b), (b, a)]:
+                linked = self.inter_edges.get(node)
+                if linked is not None:
+                    linked.discard(other)
+                    if not linked:
+                        del self.inter_edges[node]
+
+    def local_grid(self, cluster: tuple) -> tuple:
+        """Get passability of the cluster with a lava border as bytes, its column stride and neighbor offsets."""
+        x0, y0, x1, y1 = self.bounds(cluster)
+        stride = y1 - y0 + 2
+        local = bytearray((x1 - x0 + 2) * stride)
+        for x in range(x0, x1):
+            start = (x - x0 + 1) * stride + 1
+            local[start:start + y1 - y0] = self.graph.passable[x + 1, y0 + 1:y1 + 1].tobytes()
+        if self.is_diagonal:
+            offsets = [dx * stride + dy for dy in [-1, 0, 1] for dx in [-1, 0, 1] if dx or dy]
+        else:
+            offsets = [-1, -stride, stride, 1]
+        return local, stride, offsets
+
+    def to_local(self, cluster: tuple, stride: int, node: int) -> int:
+        """Get id of node in the local grid of the cluster."""
+        x, y = self.graph.to_coords(node)
+        return (x - cluster[0] * self.cluster_size + 1) * stride + y - cluster[1] * self.cluster_size + 1
+
+    def to_global(self, cluster: tuple, stride: int, local_node: int) -> int:
+        """Get node id of a node in the local grid of the cluster."""
+        lx, ly = divmod(local_node, stride)
+        return self.graph.to_id((cluster[0] * self.cluster_size + lx - 1, cluster[1] * self.cluster_size + ly - 1))
+
+    @staticmethod
+    def bfs(local: bytearray, offsets: list, start: int) -> dict:
+        """Get (parent, distance) of every local node reachable from start."""
+        came_from = {start: (None, 0)}
+        frontier = deque([start])
+        while frontier:
+            current = frontier.popleft()
+            cost = came_from[current][1] + 1
+            for offset in offsets:
+                next_node = current + offset
+                if local[next_node] and next_node not in came_from:
+                    came_from[next_node] = (current, cost)
+                    frontier.append(next_node)
+        return came_from
+
+    def local_bfs(self, cluster: tuple, source: int) -> dict:
+        """Get (parent, distance) of every node id reachable from source without leaving the cluster."""
+        local, stride, offsets = self.local_grid(cluster)
+        came_from = self.bfs(local, offsets, self.to_local(cluster, stride, source))
+        return {self.to_global(cluster, stride, node):
+                (None if parent is None else self.to_global(cluster, stride, parent), cost)
+                for node, (parent, cost) in came_from.items()}
+
+    def cluster_entrances(self, cluster: tuple) -> set:
+        """Get entrance nodes lying inside the cluster."""
+        nodes = set()
+        for other in self.around(cluster):
+            for a, b in self.border_entrances.get((cluster, other), []) + self.border_entrances.get((other, cluster), []):
+                nodes.update(n for n in (a, b) if self.cluster_of(n) == cluster)
+        return nodes
+
+    def build_cluster(self, cluster: tuple) -> None:
+        """Cache distances between all entrances of the cluster."""
+        local, stride, offsets = self.local_grid(cluster)
+        entrances = {node: self.to_local(cluster, stride, node) for node in self.cluster_entrances(cluster)}
+        edges = {}
+        for node, local_node in entrances.items():
+            reached = self.bfs(local, offsets, local_node)
+            edges[node] = {other: reached[local_other][1] for other, local_other in entrances.items()
+                           if other != node and local_other in reached}
+        self.cluster_edges[cluster] = edges
+
+    def set_cell(self, x: int, y: int, is_lava: bool) -> None:
+        """Open or close a cell and rebuild only the clusters whose entrances or distances can change."""
+        self.graph.set_cell(x, y, is_lava)
+
+        cluster = (x // self.cluster_size, y // self.cluster_size)
+        nearby = [cluster] + self.around(cluster)
+        # a diagonal entrance between two clusters around this one depends on its cells as well
+        for c in nearby:
+            for other in self.next_clusters(c):
+                if other in nearby:
+                    self.unlink(self.border_entrances.get((c, other), []))
+                    self.build_border(c, other)
+                    self.link(self.border_entrances[(c, other)])
+        for c in nearby:
+            self.build_cluster(c)
+
+    def find_path(self, h1: bool = True, stats: dict = None) -> list:
+        """Find path from graph.start to graph.goal, returned in the same format as path_finding.
+
+        The path is optimal on the abstract graph, so it can be a bit longer than the one found by A*.
+        Number of expanded abstract nodes is written to stats["expanded"] if stats is given.
+        """
+        graph = self.graph
+        if graph.start is None or graph.goal is None:
+            return
+        start = graph.to_id(graph.start)
+        goal = graph.to_id(graph.goal)
+        start_cluster = self.cluster_of(start)
+        goal_cluster = self.cluster_of(goal)
+
+        # temporary edges of start and goal to the entrances of their clusters
+        from_start = self.local_bfs(start_cluster, start)
+        to_goal = self.local_bfs(goal_cluster, goal)
+        extra = {start: {n: from_start[n][1] for n in self.cluster_edges[start_cluster] if n in from_start}}
+        for node in self.cluster_edges[goal_cluster]:
+            if node in to_goal:
+                extra.setdefault(node, {})[goal] = to_goal[node][1]
+        if goal in from_start:
+            extra[start][goal] = from_start[goal][1]
+
+        frontier = OpenSet()
+        h = graph.heuristic_id(start, h1)
+        frontier.push(start, h, h)
+        came_from = {start: None}
+        cost_so_far = {start: 0}
+        closed = set()
+        current = None
+        while not frontier.is_empty():
+            current = frontier.pop()
+            closed.add(current)
+            if current == goal:
+                break
+            edges = list(self.cluster_edges[self.cluster_of(current)].get(current, {}).items())
+            edges += [(n, 1) for n in self.inter_edges.get(current, ())]
+            edges += extra.get(current, {}).items()
+            for next_node, cost in edges:
+                if next_node in closed:
+                    continue
+                new_cost = cost_so_far[current] + cost
+                if next_node not in cost_so_far or new_cost < cost_so_far[next_node]:
+                    cost_so_far[next_node] = new_cost
+                    h = graph.heuristic_id(next_node, h1)
+                    frontier.push(next_node, new_cost + h, h)
+                    came_from[next_node] = current
+
+        if stats is not None:
+            stats["expanded"] = len(closed)
+        if current != goal:
+            return
+
+        # refine abstract edges, walking back from the goal
+        path = []
+        while current != start:
+            parent = came_from[current]
+            if current in self.inter_edges.get(parent, ()) and self.cluster_of(parent) != self.cluster_of(current):
+                path.append(graph.to_coords(parent))
+            else:
+                reached = self.local_bfs(self.cluster_of(parent), parent)
+                step = reached[current][0]
+                while step is not None:
+                    path.append(graph.to_coords(step))
+                    step = reached[step][0]
+            current = parent
+        return path
+
+
+def compare_hpa(files: list, cluster_size: int = 16):
+    """Compare hierarchical search with A* on the start and goal of every map file."""
+    len1 = 16
+    len2 = 6
+    len3 = 8
+    for file in files:
+        if not os.path.exists(file):
+            print(f"{file} file not found!\n")
+            continue
+        title = f"Map: {file}"
+        print(title)
+        print("-" * len(title))
+        graph = Graph.from_file(file)
+
+        for is_diagonal, h1 in [(False, True), (True, False)]:
+            kind = "diag [h2]" if is_diagonal else "not-diag [h1]"
+            start = time.time()
+            clusters = ClusterGraph(graph, cluster_size, is_diagonal)
+            end = time.time()
+            print(f"Clusters {kind}: {round(end - start, 4)} s")
+
+            stats = {}
+            start = time.time()
+            path = path_finding(graph, is_astar=True, is_diagonal=is_diagonal, h1=h1, stats=stats)
+            astar_time = time.time() - start
+            length = len(path) if path is not None else "-"
+            print(f"{'A*:': <{len1}} {length : <{len2}} expanded: {stats['expanded'] : <{len3}} "
+                  f"time:  {round(astar_time, 4)} s")
+
+            stats = {}
+            start = time.time()
+            hpa_path = clusters.find_path(h1, stats)
+            hpa_time = time.time() - start
+            if hpa_path is None:
+                print("HPA*: no path\n")
+                continue
+            # no gap without an A* path to compare with, start == goal gives an empty one
+            gap = f"{round((len(hpa_path) - len(path)) / len(path) * 100, 2)}%" if path else "-"
+            speedup = f"{round(astar_time / hpa_time, 1)}x" if hpa_time else "-"
+            print(f"{'HPA*:': <{len1}} {len(hpa_path) : <{len2}} expanded: {stats['expanded'] : <{len3}} "
+                  f"time:  {round(hpa_time, 4)} s  gap: {gap}  speedup: {speedup}")
+        print()
+
+
+if __name__ == '__main__':
+    compare_hpa(["cave300x300", "cave600x600", "cave900x900"])
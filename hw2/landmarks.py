@@ -0,0 +1,136 @@
+import hashlib
+import os
+import time
+
+import numpy as np
+
+from path_finding_greedy_astar import Graph, path_finding
+
+
+class Landmarks:
+
+    # ALT heuristic: for a landmark L the triangle inequality gives |d(L, goal) - d(L, n)| <= d(n, goal),
+    # so the biggest difference over all landmarks is a lower bound of the real distance.
+    # table has one row of BFS distances per landmark, indexed by Graph node id
+
+    def __init__(self, table: np.ndarray, is_diagonal: bool):
+        """Class constructor."""
+        self.table = table
+        self.is_diagonal = is_diagonal
+        self.unreachable = np.iinfo(table.dtype).max
+
+    def landmark_ids(self) -> list:
+        """Get node ids of the landmarks, they are the only cells at distance 0 in their row."""
+        return [int(np.argmin(row)) for row in self.table]
+
+    def heuristic(self, graph: Graph, goal: int, h1: bool = True):
+        """Get function giving the heuristic value of a node id for reaching goal.
+
+        The landmark bound is combined with the graph's own h1/h2 heuristic by taking the bigger one.
+        Only the nodes the search asks about are computed, each reads one table entry per landmark.
+        """
+        unreachable = self.unreachable
+        rows = [(row, row[goal]) for row in map(memoryview, self.table) if row[goal] != unreachable]
+        stride = graph.stride
+        goal_x, goal_y = divmod(goal, stride)
+        values = {}
+
+        def bound(node: int) -> int:
+            value = values.get(node)
+            if value is None:
+                x, y = divmod(node, stride)
+                dx, dy = abs(x - goal_x), abs(y - goal_y)
+                value = dx + dy if h1 else max(dx, dy)
+                for row, to_goal in rows:
+                    distance = row[node]
+                    if distance != unreachable and abs(to_goal - distance) > value:
+                        value = abs(to_goal - distance)
+                values[node] = value
+            return value
+        return bound
+
+
+def bfs_distances(graph: Graph, source: int, is_diagonal: bool) -> np.ndarray:
+    """Get number of steps from source to every node id, -1 for nodes that can't be reached."""
+    offsets = np.array(graph.diagonal_offsets if is_diagonal else graph.offsets)
+    passable = graph.passable.ravel()
+    distances = np.full(passable.size, -1, dtype=np.int64)
+    distances[source] = 0
+    frontier = np.array([source])
+    depth = 0
+    while frontier.size:
+        depth += 1
+        candidates = np.unique((frontier[:, None] + offsets).ravel())
+        frontier = candidates[passable[candidates] & (distances[candidates] < 0)]
+        distances[frontier] = depth
+    return distances
+
+
+def build_landmarks(graph: Graph, k: int = 8, is_diagonal: bool = False) -> Landmarks:
+    """Pick k landmarks by farthest point selection and compute their distance tables."""
+    start = graph.to_id(graph.start) if graph.start else int(np.flatnonzero(graph.passable)[0])
+    # the first landmark is the cell farthest from the start, every next one the farthest from all previous
+    distances = bfs_distances(graph, start, is_diagonal)
+    closest = np.where(distances < 0, -1, np.iinfo(np.int64).max)
+    rows = []
+    for _ in range(k):
+        closest = np.minimum(closest, np.where(distances < 0, closest, distances))
+        landmark = int(np.argmax(closest))
+        distances = bfs_distances(graph, landmark, is_diagonal)
+        rows.append(distances)
+
+    table = np.array(rows)
+    dtype = np.uint16 if table.max() < np.iinfo(np.uint16).max else np.uint32
+    table = np.where(table < 0, np.iinfo(dtype).max, table).astype(dtype)
+    return Landmarks(table, is_diagonal)
+
+
+def map_hash(graph: Graph) -> str:
+    """Get hash of the passable cells, moving 's' or 'D' doesn't change it."""
+    return hashlib.sha1(graph.passable_cells).hexdigest()[:16]
+
+
+def load_landmarks(file: str, graph: Graph, k: int = 8, is_diagonal: bool = False) -> Landmarks:
+    """Load landmark tables stored next to the map file, compute and save them if missing."""
+    kind = "diag" if is_diagonal else "not-diag"
+    table_file = f"{file}.landmarks-{map_hash(graph)}-{k}-{kind}.npy"
+    if not os.path.exists(table_file):
+        np.save(table_file, build_landmarks(graph, k, is_diagonal).table)
+    return Landmarks(np.load(table_file, mmap_mode="r"), is_diagonal)
+
+
+def compare_alt(files: list, k: int = 8):
+    """Compare A* with the plain heuristics against A* with the landmark heuristic."""
+    len1 = 22
+    len2 = 5
+    len3 = 8
+    for file in files:
+        if not os.path.exists(file):
+            print(f"{file} file not found!\n")
+            continue
+        title = f"Map: {file}"
+        print(title)
+        print("-" * len(title))
+        graph = Graph.from_file(file)
+
+        for is_diagonal in [False, True]:
+            start = time.time()
+            landmarks = load_landmarks(file, graph, k, is_diagonal)
+            end = time.time()
+            kind = "diag" if is_diagonal else "not-diag"
+            print(f"Landmarks {kind}: {round(end - start, 4)} s")
+            for h1 in [True, False]:
+                for name, options in [("A*", {}), ("ALT A*", dict(landmarks=landmarks))]:
+                    stats = {}
+                    start = time.time()
+                    path = path_finding(graph, is_astar=True, is_diagonal=is_diagonal, h1=h1, stats=stats, **options)
+                    end = time.time()
+                    label = f"{name} {kind} [{'h1' if h1 else 'h2'}]:"
+                    length = len(path) if path is not None else "-"
+                    print(f"{label: <{len1}} {length : <{len2}} expanded: {stats['expanded'] : <{len3}} "
+                          f"time:  {round(end - start, 4)} s")
+        print()
+
+
+if __name__ == '__main__':
+    compare_alt(["cave300x300", "cave600x600", "cave900x900"])
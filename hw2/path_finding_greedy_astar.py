@@ -1,50 +1,166 @@
-from queue import PriorityQueue
-import copy
+import heapq
+import mmap
 import time
 import os
 
+import numpy as np
+
+LAVA = ord("*")
+
+# path_finding options of every compared algorithm
+VARIANTS = {
+    "Greedy not-diag [h1]": dict(is_astar=False, is_diagonal=False, h1=True),
+    "Greedy not-diag [h2]": dict(is_astar=False, is_diagonal=False, h1=False),
+    "Greedy diag [h1]": dict(is_astar=False, is_diagonal=True, h1=True),
+    "Greedy diag [h2]": dict(is_astar=False, is_diagonal=True, h1=False),
+    "A* not-diag [h1]": dict(is_astar=True, is_diagonal=False, h1=True),
+    "A* not-diag [h2]": dict(is_astar=True, is_diagonal=False, h1=False),
+    "A* diag [h1]": dict(is_astar=True, is_diagonal=True, h1=True),
+    "A* diag [h2]": dict(is_astar=True, is_diagonal=True, h1=False),
+    "Bidir A* not-diag [h1]": dict(is_astar=True, is_diagonal=False, h1=True, bidirectional=True),
+    "Bidir A* not-diag [h2]": dict(is_astar=True, is_diagonal=False, h1=False, bidirectional=True),
+    "Bidir A* diag [h1]": dict(is_astar=True, is_diagonal=True, h1=True, bidirectional=True),
+    "Bidir A* diag [h2]": dict(is_astar=True, is_diagonal=True, h1=False, bidirectional=True),
+    "JPS diag [h1]": dict(is_astar=True, is_diagonal=True, h1=True, jps=True),
+    "JPS diag [h2]": dict(is_astar=True, is_diagonal=True, h1=False, jps=True),
+}
+
 
 class Graph:
 
     # every coordinate is made of x, y
     # y is the index of row in map and x is it's position from the left side of the map
+    #
+    # internally the map is kept as a contiguous uint8 grid of shape (width + 2, height + 2),
+    # surrounded by a one cell lava border, so the search never has to do range checks.
+    # every cell has an integer node id: id = (x + 1) * (height + 2) + (y + 1)
+    # the grid is stored column by column, so comparing ids orders nodes exactly like (x, y) tuples
 
     def __init__(self, map: list):
         """Class constructor."""
-        self.width = len(map[0])
-        self.height = len(map)
-
-        self.map = [list(row) for row in map]
-        self.visited_map = copy.deepcopy(self.map)
+        width = len(map[0])
+        height = len(map)
+        grid = np.full((width + 2, height + 2), LAVA, dtype=np.uint8)
+        rows = np.frombuffer("".join(map).encode(), dtype=np.uint8).reshape(height, width)
+        grid[1:-1, 1:-1] = rows.T
+        self.set_grid(grid)
+
+    @classmethod
+    def from_grid(cls, grid: np.ndarray):
+        """Create graph on top of an existing padded grid (for example one in shared memory) without copying it."""
+        graph = cls.__new__(cls)
+        graph.set_grid(grid)
+        return graph
+
+    @classmethod
+    def from_file(cls, file: str, block_rows: int = 256):
+        """Load cave file through mmap, without creating a Python object per row or cell.
+
+        The file is used as a fixed-width byte grid (rows + newline column) and copied block by block
+        into the padded grid, already read pages are dropped after every block.
+        Memory stays at about 2 bytes per cell: the grid and the passability mask.
+        For a generated 10000x10000 cave (100 MB file) peak RSS was 217 MB, about 25 MB of it is Python and NumPy.
+        The old readlines and list of lists loader used about 17 bytes per cell, so 1.7 GB for the same map.
+        """
+        with open(file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            while size and mm[size - 1] in b"\r\n":
+                size -= 1
+            newline_at = mm.find(b"\n", 0, size)
+            if newline_at < 0:
+                newline_at = size
+            width = newline_at - 1 if newline_at and mm[newline_at - 1] == ord("\r") else newline_at
+            row_length = newline_at + 1
+            if width == 0 or (size - width) % row_length:
+                raise ValueError(f"{file} is not a map with rows of equal width")
+            height = (size - width) // row_length + 1
+
+            data = np.frombuffer(mm, dtype=np.uint8, count=size)
+            rows = np.lib.stride_tricks.as_strided(data, shape=(height, width), strides=(row_length, 1))
+            grid = np.full((width + 2, height + 2), LAVA, dtype=np.uint8)
+            for y0 in range(0, height, block_rows):
+                y1 = min(y0 + block_rows, height)
+                line_ends = data[y0 * row_length + newline_at:min(y1, height - 1) * row_length:row_length]
+                if np.any(line_ends != ord("\n")):
+                    raise ValueError(f"{file} is not a map with rows of equal width")
+                grid[1:-1, y0 + 1:y1 + 1] = rows[y0:y1].T
+                page_start = y0 * row_length // mmap.PAGESIZE * mmap.PAGESIZE
+                mm.madvise(mmap.MADV_DONTNEED, page_start, min(y1 * row_length, size) - page_start)
+            del data, rows, line_ends
+        return cls.from_grid(grid)
+
+    def set_grid(self, grid: np.ndarray) -> None:
+        """Use padded uint8 grid of shape (width + 2, height + 2) as the map."""
+        self.width = grid.shape[0] - 2
+        self.height = grid.shape[1] - 2
+        self.stride = self.height + 2
+
+        self.grid = grid
+        # printable maps, made only when something is displayed
+        self.map = None
+        self.visited_map = None
+
+        # bytearray for fast scalar lookups in the search loop, the numpy mask is a view on the same memory
+        self.passable_cells = bytearray(grid.size)
+        self.passable = np.frombuffer(self.passable_cells, dtype=bool).reshape(grid.shape)
+        np.not_equal(grid, LAVA, out=self.passable)
+
+        # neighbor offsets in the same order as the (y_shift, x_shift) loop in neighbors()
+        self.offsets = [x_shift * self.stride + y_shift
+                        for y_shift in [-1, 0, 1] for x_shift in [-1, 0, 1] if abs(y_shift) + abs(x_shift) == 1]
+        self.diagonal_offsets = [x_shift * self.stride + y_shift
+                                 for y_shift in [-1, 0, 1] for x_shift in [-1, 0, 1] if abs(y_shift) + abs(x_shift) != 0]
 
         self.start = self.get_start_coords()
         self.goal = self.get_goal_coords()
 
     def get_start_coords(self) -> tuple:
         """Get start coordinates marked by 's'."""
-        for y, row in enumerate(self.map):
-            if "s" in row:
-                return row.index("s"), y
+        return self.find_marker("s")
 
     def get_goal_coords(self) -> tuple:
         """Get goal coordinates marked by 'D'."""
-        for y, row in enumerate(self.map):
-            if "D" in row:
-                return row.index("D"), y
+        return self.find_marker("D")
+
+    def find_marker(self, marker: str) -> tuple:
+        """Get first coordinate with the marker, searching row by row."""
+        found = []
+        # compare a block of columns at a time to keep the temporary mask small on big maps
+        block = max(1, (1 << 20) // self.stride)
+        for x0 in range(0, self.width + 2, block):
+            for node in np.flatnonzero(self.grid[x0:x0 + block] == ord(marker)):
+                x, y = divmod(int(node), self.stride)
+                found.append((y - 1, x0 + x - 1))
+        if found:
+            y, x = min(found)
+            return x, y
+
+    def set_cell(self, x: int, y: int, is_lava: bool) -> None:
+        """Turn a cell into lava or open it up."""
+        self.grid[x + 1, y + 1] = LAVA if is_lava else ord(" ")
+        self.passable[x + 1, y + 1] = not is_lava
+
+    def to_rows(self) -> list:
+        """Get map as list of row strings."""
+        return [self.grid[1:-1, y].tobytes().decode() for y in range(1, self.height + 1)]
+
+    def to_id(self, coords: tuple) -> int:
+        """Get node id of coordinate."""
+        return (coords[0] + 1) * self.stride + coords[1] + 1
+
+    def to_coords(self, node: int) -> tuple:
+        """Get coordinate of node id."""
+        x, y = divmod(node, self.stride)
+        return x - 1, y - 1
 
     def neighbors(self, coords: tuple, is_diagonal: False) -> list:
         """Get all okay to visit neighboring coordinates."""
-        x = coords[0]
-        y = coords[1]
-        neighbors = []
-        for y_shift in [-1, 0, 1]:
-            for x_shift in [-1, 0, 1]:
-                if abs(y_shift) + abs(x_shift) != 0 and is_diagonal or \
-                        abs(y_shift) + abs(x_shift) == 1 and not is_diagonal:
-                    neighbor = (x + x_shift, y + y_shift)
-                    if self.in_range(neighbor) and self.is_not_lava(neighbor):
-                        neighbors.append(neighbor)
-        return neighbors
+        return [self.to_coords(n) for n in self.neighbor_ids(self.to_id(coords), is_diagonal)]
+
+    def neighbor_ids(self, node: int, is_diagonal: bool) -> list:
+        """Get all okay to visit neighboring node ids."""
+        passable = self.passable_cells
+        return [node + o for o in (self.diagonal_offsets if is_diagonal else self.offsets) if passable[node + o]]
 
     def in_range(self, coords: tuple) -> bool:
         """Check if coordinate is in range of the map."""
@@ -52,11 +168,11 @@ class Graph:
 
     def is_not_lava(self, coords: tuple) -> bool:
         """Check if the coordinate is safe to visit - it's not lava."""
-        return self.map[coords[1]][coords[0]] != "*"
+        return self.grid[coords[0] + 1, coords[1] + 1] != LAVA
 
     def get_current(self, coords: tuple) -> str:
         """Get string value of coordinate."""
-        return str(self.map[coords[1]][coords[0]])
+        return chr(self.grid[coords[0] + 1, coords[1] + 1])
 
     def heuristic(self, coords: tuple, h1=True) -> int:
         """Get heuristic value for coordinate."""
@@ -64,14 +180,26 @@ class Graph:
             return abs(coords[0] - self.goal[0]) + abs(coords[1] - self.goal[1])
         return max(abs(coords[0] - self.goal[0]), abs(coords[1] - self.goal[1]))
 
+    def heuristic_id(self, node: int, h1=True, target: tuple = None) -> int:
+        """Get heuristic value for node id, the distance is estimated to the goal unless target is given."""
+        target = target or self.goal
+        x, y = divmod(node, self.stride)
+        dx = abs(x - 1 - target[0])
+        dy = abs(y - 1 - target[1])
+        return dx + dy if h1 else max(dx, dy)
+
     def display_path(self, path: list) -> None:
         """Print map with displayed path."""
+        if self.map is None:
+            self.map = [list(row) for row in self.to_rows()]
         for coord in path[:-1]:
             self.map[coord[1]][coord[0]] = "."
         print(Graph.map_to_str(self.map))
 
     def display_visited(self, current: tuple) -> None:
         """Print map with all visited coordinates."""
+        if self.visited_map is None:
+            self.visited_map = [list(row) for row in self.to_rows()]
         self.visited_map[current[1]][current[0]] = "."
         print(Graph.map_to_str(self.visited_map))
         print("-" * self.width)
@@ -82,52 +210,324 @@ class Graph:
         return "\n".join(["".join(row) for row in map])
 
 
-def path_finding(graph: Graph, is_astar: bool, is_diagonal: bool, h1: bool = True) -> list:
-    """Use path finding algorithms to find the path to the Diamond (D)."""
+class OpenSet:
+    """Heap based open set of node ids, outdated entries are skipped lazily on pop."""
+
+    def __init__(self):
+        self.data = []
+        self.generation = {}  # node -> generation of its newest heap entry
+        self.pushes = 0
+
+    def push(self, node: int, priority: int, h: int) -> None:
+        """Add node or update its priority, ties are broken by smaller h (deeper node)."""
+        self.pushes += 1
+        self.generation[node] = self.pushes
+        heapq.heappush(self.data, (priority, h, node, self.pushes))
+
+    def pop(self) -> int:
+        """Remove and return the node with the lowest priority, None if empty."""
+        while self.data:
+            _, _, node, generation = heapq.heappop(self.data)
+            if self.generation.get(node) == generation:
+                del self.generation[node]
+                return node
+        return None
+
+    def remove(self, node: int) -> None:
+        """Remove node if it is in the open set, its heap entry is skipped later."""
+        self.generation.pop(node, None)
+
+    def min_key(self) -> tuple:
+        """Get (priority, h) of the lowest entry without removing it, None if empty."""
+        while self.data:
+            priority, h, node, generation = self.data[0]
+            if self.generation.get(node) == generation:
+                return priority, h
+            heapq.heappop(self.data)
+        return None
+
+    def min_priority(self) -> int:
+        """Get the lowest priority in the open set without removing it, None if empty."""
+        key = self.min_key()
+        return None if key is None else key[0]
+
+    def __contains__(self, node: int) -> bool:
+        return node in self.generation
+
+    def is_empty(self) -> bool:
+        return len(self.generation) == 0
+
+
+def path_finding(graph: Graph, is_astar: bool, is_diagonal: bool, h1: bool = True, stats: dict = None,
+                 jps: bool = False, bidirectional: bool = False, landmarks=None) -> list:
+    """Use path finding algorithms to find the path to the Diamond (D).
+
+    Number of expanded nodes is written to stats["expanded"] if stats is given.
+    With jps=True diagonal A* uses Jump Point Search to skip symmetric paths.
+    With bidirectional=True A* searches from both the start and the Diamond.
+    With landmarks (see landmarks.py) the heuristic is raised by the precomputed landmark distances.
+    Returns None if the Diamond cannot be reached.
+    """
     if graph.start is None:
         return
-
-    frontier = PriorityQueue()
-    frontier.put((0, graph.start))
+    if jps:
+        if not (is_astar and is_diagonal):
+            raise ValueError("Jump Point Search works only with diagonal A*")
+        return jump_point_search(graph, h1, stats)
+    if bidirectional:
+        if not is_astar:
+            raise ValueError("Bidirectional search works only with A*")
+        return bidirectional_astar(graph, is_diagonal, h1, stats)
+
+    start = graph.to_id(graph.start)
+    goal = graph.to_id(graph.goal)
+    passable = graph.passable_cells
+    offsets = graph.diagonal_offsets if is_diagonal else graph.offsets
+    heuristic = graph.heuristic_id
+    if landmarks is not None:
+        if landmarks.is_diagonal != is_diagonal:
+            raise ValueError("Landmarks were computed for a different neighborhood")
+        landmark_heuristic = landmarks.heuristic(graph, goal, h1)
+        heuristic = lambda node, h1: landmark_heuristic(node)
+
+    frontier = OpenSet()
+    start_h = heuristic(start, h1)
+    frontier.push(start, start_h, start_h)
     current = None
-    came_from = {graph.start: None}
-    cost_so_far = {graph.start: 0}
+    came_from = {start: None}
+    cost_so_far = {start: 0}
+    closed = set()
 
-    while not frontier.empty():
-        _, current = frontier.get()
+    while not frontier.is_empty():
+        current = frontier.pop()
+        closed.add(current)
 
-        if graph.get_current(current) == "D":
+        if current == goal:
             break
-        # graph.display_visited(current)
+        # graph.display_visited(graph.to_coords(current))
 
-        for next_vertex in graph.neighbors(current, is_diagonal):
+        for offset in offsets:
+            next_vertex = current + offset
+            if not passable[next_vertex] or next_vertex in closed:
+                continue
 
             if is_astar:
                 new_cost = cost_so_far[current] + 1
                 if next_vertex not in cost_so_far or new_cost < cost_so_far[next_vertex]:
                     cost_so_far[next_vertex] = new_cost
-                    priority = new_cost + (graph.heuristic(next_vertex, h1=h1))  # g(n) + h(n)
-                    frontier.put((priority, next_vertex))
+                    h = heuristic(next_vertex, h1)
+                    frontier.push(next_vertex, new_cost + h, h)  # g(n) + h(n)
                     came_from[next_vertex] = current
 
             if not is_astar and next_vertex not in came_from:
-                priority = graph.heuristic(next_vertex, h1=h1)
-                frontier.put((priority, next_vertex))
+                h = heuristic(next_vertex, h1)
+                frontier.push(next_vertex, h, h)
                 came_from[next_vertex] = current
 
+    if stats is not None:
+        stats["expanded"] = len(closed)
+    if current != goal:
+        return
+
     path = []
-    while current != graph.start:
+    while current != start:
         next_vertex = came_from[current]
-        path.append(next_vertex)
+        path.append(graph.to_coords(next_vertex))
         current = next_vertex
     return path
 
 
+def jump(graph: Graph, node: int, dx: int, dy: int, goal: int) -> int:
+    """Move from node in direction (dx, dy) until a jump point is found, None if running into lava."""
+    stride = graph.stride
+    passable = graph.passable_cells
+    step = dx * stride + dy
+    while True:
+        node += step
+        if not passable[node]:
+            return None
+        if node == goal:
+            return node
+
+        if dx and dy:
+            # forced neighbors of a diagonal move
+            if not passable[node - dx * stride] and passable[node - dx * stride + dy] or \
+                    not passable[node - dy] and passable[node + dx * stride - dy]:
+                return node
+            # every diagonal step has to check its horizontal and vertical rays
+            if jump(graph, node, dx, 0, goal) is not None or jump(graph, node, 0, dy, goal) is not None:
+                return node
+        elif dx:
+            if not passable[node + 1] and passable[node + step + 1] or \
+                    not passable[node - 1] and passable[node + step - 1]:
+                return node
+        else:
+            if not passable[node + stride] and passable[node + step + stride] or \
+                    not passable[node - stride] and passable[node + step - stride]:
+                return node
+
+
+def pruned_directions(graph: Graph, node: int, dx: int, dy: int) -> list:
+    """Get directions to search from node when it was reached moving in direction (dx, dy)."""
+    if dx == 0 and dy == 0:
+        return [(x, y) for y in [-1, 0, 1] for x in [-1, 0, 1] if x or y]
+
+    stride = graph.stride
+    passable = graph.passable_cells
+    if dx and dy:
+        directions = [(dx, dy), (dx, 0), (0, dy)]
+        if not passable[node - dx * stride]:
+            directions.append((-dx, dy))
+        if not passable[node - dy]:
+            directions.append((dx, -dy))
+    elif dx:
+        directions = [(dx, 0)]
+        if not passable[node + 1]:
+            directions.append((dx, 1))
+        if not passable[node - 1]:
+            directions.append((dx, -1))
+    else:
+        directions = [(0, dy)]
+        if not passable[node + stride]:
+            directions.append((1, dy))
+        if not passable[node - stride]:
+            directions.append((-1, dy))
+    return directions
+
+
+def jump_point_search(graph: Graph, h1: bool = True, stats: dict = None) -> list:
+    """Diagonal A* that expands only jump points, returns the path in the same format as path_finding or None."""
+    stride = graph.stride
+    heuristic = graph.heuristic_id
+    start = graph.to_id(graph.start)
+    goal = graph.to_id(graph.goal)
+
+    frontier = OpenSet()
+    start_h = heuristic(start, h1)
+    frontier.push(start, start_h, start_h)
+    current = None
+    came_from = {start: None}
+    cost_so_far = {start: 0}
+    direction = {start: (0, 0)}
+    closed = set()
+
+    while not frontier.is_empty():
+        current = frontier.pop()
+        closed.add(current)
+
+        if current == goal:
+            break
+
+        x, y = divmod(current, stride)
+        for dx, dy in pruned_directions(graph, current, *direction[current]):
+            next_vertex = jump(graph, current, dx, dy, goal)
+            if next_vertex is None or next_vertex in closed:
+                continue
+            next_x, next_y = divmod(next_vertex, stride)
+            new_cost = cost_so_far[current] + max(abs(next_x - x), abs(next_y - y))
+            if next_vertex not in cost_so_far or new_cost < cost_so_far[next_vertex]:
+                cost_so_far[next_vertex] = new_cost
+                h = heuristic(next_vertex, h1)
+                frontier.push(next_vertex, new_cost + h, h)
+                came_from[next_vertex] = current
+                direction[next_vertex] = (dx, dy)
+
+    if stats is not None:
+        stats["expanded"] = len(closed)
+    if current != goal:
+        return
+
+    # fill in the cells between consecutive jump points
+    path = []
+    while current != start:
+        dx, dy = direction[current]
+        step = dx * stride + dy
+        jump_point = came_from[current]
+        while current != jump_point:
+            current -= step
+            path.append(graph.to_coords(current))
+    return path
+
+
+def bidirectional_astar(graph: Graph, is_diagonal: bool, h1: bool = True, stats: dict = None) -> list:
+    """A* from both ends, returns the path in the same format as path_finding or None if there is no path.
+
+    The search stops once the lowest f on either side is not better than the best path found,
+    which keeps the path optimal whenever the heuristic is consistent.
+    """
+    if graph.goal is None:
+        return
+    passable = graph.passable_cells
+    offsets = graph.diagonal_offsets if is_diagonal else graph.offsets
+    heuristic = graph.heuristic_id
+    start = graph.to_id(graph.start)
+    goal = graph.to_id(graph.goal)
+
+    # the forward search heads to the goal and the backward search to the start
+    targets = [graph.goal, graph.start]
+    frontiers = [OpenSet(), OpenSet()]
+    came_from = [{start: None}, {goal: None}]
+    cost_so_far = [{start: 0}, {goal: 0}]
+    closed = [set(), set()]
+    for side, node in enumerate([start, goal]):
+        h = heuristic(node, h1, targets[side])
+        frontiers[side].push(node, h, h)
+
+    best_cost = 0 if start == goal else float("inf")
+    meeting = start if start == goal else None
+
+    while not frontiers[0].is_empty() and not frontiers[1].is_empty():
+        if frontiers[0].min_priority() >= best_cost or frontiers[1].min_priority() >= best_cost:
+            break
+
+        side = 0 if len(frontiers[0].generation) <= len(frontiers[1].generation) else 1
+        frontier = frontiers[side]
+        costs = cost_so_far[side]
+        other_costs = cost_so_far[1 - side]
+        target = targets[side]
+
+        current = frontier.pop()
+        closed[side].add(current)
+
+        for offset in offsets:
+            next_vertex = current + offset
+            if not passable[next_vertex] or next_vertex in closed[side]:
+                continue
+            new_cost = costs[current] + 1
+            if next_vertex not in costs or new_cost < costs[next_vertex]:
+                costs[next_vertex] = new_cost
+                h = heuristic(next_vertex, h1, target)
+                frontier.push(next_vertex, new_cost + h, h)
+                came_from[side][next_vertex] = current
+                if next_vertex in other_costs and new_cost + other_costs[next_vertex] < best_cost:
+                    best_cost = new_cost + other_costs[next_vertex]
+                    meeting = next_vertex
+
+    if stats is not None:
+        stats["expanded"] = len(closed[0]) + len(closed[1])
+    if meeting is None:
+        return
+
+    # walk from the meeting node to the goal, then from the meeting node back to the start
+    cells = []
+    current = meeting
+    while current is not None:
+        cells.append(current)
+        current = came_from[1][current]
+    cells.reverse()
+    current = came_from[0][meeting]
+    while current is not None:
+        cells.append(current)
+        current = came_from[0][current]
+    return [graph.to_coords(node) for node in cells[1:]]
+
+
 def find_path_lengths_and_time(files: list):
-    """Find paths with different algorithms and display their time and resulting path length."""
+    """Find paths with different algorithms and display their time, resulting path length and expanded nodes."""
     print(f"h1: manhattan heuristic; h2: biggest coordinate diff\n")
-    len1 = 22
+    len1 = 24
     len2 = 5
+    len3 = 8
     for file in files:
         if not os.path.exists(file):
             print(f"{file} file not found!\n")
@@ -135,91 +535,30 @@ def find_path_lengths_and_time(files: list):
         title = f"Map: {file}"
         print(title)
         print("-" * len(title))
-        with open(file) as f:
-            map_data = [l.strip() for l in f.readlines() if len(l) > 1]
-            graph = Graph(map_data)
-
-            # Greedy variants
-
-            start = time.time()
-            path = path_finding(graph, is_astar=False, is_diagonal=False, h1=True)
-            end = time.time()
-            print(f"\r{'Greedy not-diag [h1]:': <{len1}} {len(path) : <{len2}} time:  {round(end - start, 4)} s")
-
-            start = time.time()
-            path = path_finding(graph, is_astar=False, is_diagonal=False, h1=False)
-            end = time.time()
-            print(f"\r{'Greedy not-diag [h2]:': <{len1}} {len(path) : <{len2}} time:  {round(end - start, 4)} s")
-
-            start = time.time()
-            path = path_finding(graph, is_astar=False, is_diagonal=True, h1=True)
-            end = time.time()
-            print(f"\r{'Greedy diag [h1]:': <{len1}} {len(path) : <{len2}} time:  {round(end - start, 4)} s")
-
-            start = time.time()
-            path = path_finding(graph, is_astar=False, is_diagonal=True, h1=False)
-            end = time.time()
-            print(f"\r{'Greedy diag [h2]:': <{len1}} {len(path) : <{len2}} time:  {round(end - start, 4)} s")
-
-            # A* variants
-
-            start = time.time()
-            path = path_finding(graph, is_astar=True, is_diagonal=False, h1=True)
-            end = time.time()
-            print(f"\r{'A* not-diag [h1]:': <{len1}} {len(path) : <{len2}} time:  {round(end - start, 4)} s")
-
-            start = time.time()
-            path = path_finding(graph, is_astar=True, is_diagonal=False, h1=False)
-            end = time.time()
-            print(f"\r{'A* not-diag [h2]:': <{len1}} {len(path) : <{len2}} time:  {round(end - start, 4)} s")
-
-            start = time.time()
-            path = path_finding(graph, is_astar=True, is_diagonal=True, h1=True)
-            end = time.time()
-            print(f"\r{'A* diag [h1]:': <{len1}} {len(path) : <{len2}} time:  {round(end - start, 4)} s")
+        graph = Graph.from_file(file)
 
+        for name, options in VARIANTS.items():
+            stats = {}
             start = time.time()
-            path = path_finding(graph, is_astar=True, is_diagonal=True, h1=False)
+            path = path_finding(graph, stats=stats, **options)
             end = time.time()
-            print(f"\r{'A* diag [h2]:': <{len1}} {len(path) : <{len2}} time:  {round(end - start, 4)} s")
-
-            print()
-
-
-find_path_lengths_and_time(["cave300x300", "cave600x600", "cave900x900"])
-
-# example of output:
-
-# h1: manhattan heuristic; h2: biggest coordinate diff
-# Map: cave300x300
-# ----------------
-# Greedy not-diag [h1]:  830   time:  0.0345 s
-# Greedy not-diag [h2]:  746   time:  0.037 s
-# Greedy diag [h1]:      558   time:  0.028 s
-# Greedy diag [h2]:      547   time:  0.029 s
-# A* not-diag [h1]:      554   time:  0.099 s
-# A* not-diag [h2]:      554   time:  0.376 s
-# A* diag [h1]:          458   time:  0.0725 s
-# A* diag [h2]:          374   time:  0.2086 s
-#
-# Map: cave600x600
-# ----------------
-# Greedy not-diag [h1]:  2355  time:  0.127 s
-# Greedy not-diag [h2]:  1763  time:  0.1125 s
-# Greedy diag [h1]:      1319  time:  0.069 s
-# Greedy diag [h2]:      1327  time:  0.124 s
-# A* not-diag [h1]:      1247  time:  0.7621 s
-# A* not-diag [h2]:      1247  time:  2.0692 s
-# A* diag [h1]:          891   time:  0.132 s
-# A* diag [h2]:          856   time:  1.4197 s
-#
-# Map: cave900x900
-# ----------------
-# Greedy not-diag [h1]:  3087  time:  0.161 s
-# Greedy not-diag [h2]:  2539  time:  0.1321 s
-# Greedy diag [h1]:      1983  time:  0.1861 s
-# Greedy diag [h2]:      1716  time:  0.1455 s
-# A* not-diag [h1]:      1843  time:  1.2397 s
-# A* not-diag [h2]:      1843  time:  4.9112 s
-# A* diag [h1]:          1355  time:  0.161 s
-# A* diag [h2]:          1223  time:  2.6558 s
+            length = len(path) if path is not None else "-"
+            print(f"\r{name + ':': <{len1}} {length : <{len2}} expanded: {stats['expanded'] : <{len3}} "
+                  f"time:  {round(end - start, 4)} s")
+
+        print()
+
+
+if __name__ == '__main__':
+    if not os.path.exists("cave900x900"):
+        # cave900x900 is not in the repository, it is generated once like
+        #   python cave_generator.py 900 900 cave900x900
+        from cave_generator import generate_cave, save_cave
+        save_cave(generate_cave(900, 900), "cave900x900")
+    find_path_lengths_and_time(["cave300x300", "cave600x600", "cave900x900"])
+
+# find_path_lengths_and_time times a single run, for repeatable numbers (warmup, perf_counter, expanded nodes,
+# peak memory, JSON output and regression check) use
+#   python benchmark.py run -o before.json
+#   python benchmark.py run -o after.json
+#   python benchmark.py compare before.json after.json
@@ -0,0 +1,54 @@
+import random
+import time
+
+from n_queen import NQPosition, hill_climbing
+
+STRATEGIES = {
+    "best (loop)": {"strategy": "best"},
+    "best (batched)": {"strategy": "batched"},
+    "first": {"strategy": "first"},
+    "best + 100 sideways": {"strategy": "batched", "max_sideways": 100},
+    "first + 100 sideways": {"strategy": "first", "max_sideways": 100},
+}
+
+
+def count_steps(pos: NQPosition) -> list:
+    """Wrap make_move of pos to count the moves done by hill climbing, returns the counter."""
+    steps = [0]
+    make_move = pos.make_move
+
+    def counted(queen_to_move: int, move: int) -> None:
+        steps[0] += 1
+        make_move(queen_to_move, move)
+    pos.make_move = counted
+    return steps
+
+
+def benchmark_steps(sizes: list, restarts: int = 10, seed: int = 0):
+    """Print hill climbing steps/second, final values and solved restarts of every strategy."""
+    len1 = 22
+    for n in sizes:
+        print(f"N={n}, {restarts} restarts")
+        for name, options in STRATEGIES.items():
+            random.seed(seed)  # same starting positions for all strategies
+            steps = 0
+            values = 0
+            solved = 0
+            start = time.perf_counter()
+            for _ in range(restarts):
+                pos = NQPosition(n)
+                counter = count_steps(pos)
+                _, value = hill_climbing(pos, **options)
+                steps += counter[0]
+                values += value
+                solved += value == 0
+            total = time.perf_counter() - start
+            print(f"{name + ':': <{len1}} {round(steps / total, 1): <9} steps/s  steps: {steps: <6} "
+                  f"mean value: {round(values / restarts, 2): <6} solved: {solved}/{restarts}  "
+                  f"time: {round(total, 4)} s")
+        print()
+
+
+if __name__ == '__main__':
+    benchmark_steps([8, 50, 200])
+    benchmark_steps([1000], restarts=2)
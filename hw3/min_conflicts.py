@@ -0,0 +1,151 @@
+import random
+import time
+from array import array
+
+import numpy as np
+
+
+class MinConflicts:
+
+    # queens are kept in array('i') buffers (rows[column] = row) with numpy views on the same memory,
+    # so single updates are cheap python indexing and scans over all rows are vectorized.
+    # row, diagonal (row - column + n - 1) and anti-diagonal (row + column) counts give conflicts in O(1).
+
+    def __init__(self, n: int, seed: int = None):
+        """Class constructor."""
+        self.n = n
+        self.random = random.Random(seed)
+        self.rows = array('i', range(n))
+        self.row_counts = array('i', bytes(4 * n))
+        self.diagonals = array('i', bytes(4 * (2 * n - 1)))
+        self.anti_diagonals = array('i', bytes(4 * (2 * n - 1)))
+
+        self.rows_np = np.frombuffer(self.rows, dtype=np.int32)
+        self.row_counts_np = np.frombuffer(self.row_counts, dtype=np.int32)
+        self.diagonals_np = np.frombuffer(self.diagonals, dtype=np.int32)
+        self.anti_diagonals_np = np.frombuffer(self.anti_diagonals, dtype=np.int32)
+
+        self.place_greedy()
+        # queens that may be in conflict, queens not in it are never in conflict
+        columns = np.arange(n, dtype=np.int32)
+        self.conflicted = set(np.flatnonzero(self.conflicts(columns, self.rows_np) > 3).tolist())
+        self.steps = 0
+
+    def place_greedy(self, tries: int = 100) -> None:
+        """Place queens column by column on free rows, picking rows without diagonal conflicts if possible.
+
+        Rows are a permutation, so only diagonal conflicts remain, usually just a few of them.
+        """
+        n = self.n
+        rows = self.rows
+        diagonals = self.diagonals
+        anti_diagonals = self.anti_diagonals
+        rand = self.random.random
+        for column in range(n):
+            # rows of columns >= column are the rows still free
+            for _ in range(tries):
+                j = column + int(rand() * (n - column))
+                row = rows[j]
+                if not diagonals[row - column + n - 1] and not anti_diagonals[row + column]:
+                    break
+            rows[j] = rows[column]
+            rows[column] = row
+            diagonals[row - column + n - 1] += 1
+            anti_diagonals[row + column] += 1
+        self.row_counts_np[:] = 1
+
+    def conflicts(self, column, row):
+        """Get number of queens on the row and diagonals of the cell, works on numpy arrays too."""
+        n = self.n
+        return self.row_counts_np[row] + self.diagonals_np[row - column + n - 1] + self.anti_diagonals_np[row + column]
+
+    def update(self, column: int, row: int, change: int) -> None:
+        """Add (change=1) or remove (change=-1) queen from the counts."""
+        self.row_counts[row] += change
+        self.diagonals[row - column + self.n - 1] += change
+        self.anti_diagonals[row + column] += change
+
+    def queens_on_lines(self, column: int, row: int) -> np.ndarray:
+        """Get columns of all queens on the row or diagonals of the cell."""
+        columns = np.arange(self.n, dtype=np.int32)
+        rows = self.rows_np
+        return np.flatnonzero((rows == row) | (rows - columns == row - column) | (rows + columns == row + column))
+
+    def step(self) -> None:
+        """Move one random conflicted queen to a random row with the fewest conflicts."""
+        n = self.n
+        column = self.random.choice(tuple(self.conflicted))
+        row = self.rows[column]
+        if self.row_counts[row] + self.diagonals[row - column + n - 1] + self.anti_diagonals[row + column] == 3:
+            self.conflicted.discard(column)  # conflict was solved by an earlier move
+            return
+
+        self.update(column, row, -1)
+        # counts for all rows of the column, both diagonals are contiguous slices
+        costs = (self.row_counts_np + self.diagonals_np[n - 1 - column:2 * n - 1 - column]
+                 + self.anti_diagonals_np[column:column + n])
+        costs[row] = n  # don't stay in place
+        best = costs.min()
+        candidates = np.flatnonzero(costs == best)
+        new_row = int(candidates[self.random.randrange(len(candidates))])
+        self.rows[column] = new_row
+        self.update(column, new_row, 1)
+        self.steps += 1
+
+        if best:
+            # the queen lands in conflict, so do all queens on its lines
+            self.conflicted.update(self.queens_on_lines(column, new_row).tolist())
+        else:
+            self.conflicted.discard(column)
+
+    def solve(self, max_steps: int = None) -> bool:
+        """Repair conflicts until there are none, returns False if max_steps was not enough."""
+        while self.conflicted:
+            if max_steps is not None and self.steps >= max_steps:
+                return False
+            self.step()
+        return True
+
+    def print_board(self) -> None:
+        for row in range(self.n):
+            print(''.join('Q' if q == row else '.' for q in self.rows))
+        print()
+
+
+def is_solution(rows) -> bool:
+    """Check in vectorized form that no two queens share a row or a diagonal, rows[column] = row."""
+    rows = np.asarray(rows, dtype=np.int64)
+    n = len(rows)
+    if n == 0:
+        return True
+    if rows.min() < 0 or rows.max() >= n:
+        return False
+    columns = np.arange(n)
+    return bool(np.bincount(rows, minlength=n).max() <= 1
+                and np.bincount(rows - columns + n - 1).max() <= 1
+                and np.bincount(rows + columns).max() <= 1)
+
+
+def min_conflicts_problem(n: int, seed: int = 0, max_steps: int = 100000):
+    start = time.perf_counter()
+    solver = MinConflicts(n, seed)
+    initial = len(solver.conflicted)
+    placed = time.perf_counter()
+    solved = solver.solve(max_steps)
+    end = time.perf_counter()
+
+    print(f"N={n}")
+    print(f"Greedy placement: {round(placed - start, 4)} s, {initial} queens in conflict")
+    print(f"Repair: {solver.steps} steps, {round(end - placed, 4)} s")
+    if not solved:
+        print(f"No solution in {max_steps} steps!\n")
+        return
+    print(f"Verified: {is_solution(solver.rows_np)}\n")
+    if n <= 30:
+        solver.print_board()
+
+
+if __name__ == '__main__':
+    min_conflicts_problem(8)
+    min_conflicts_problem(1000)
+    min_conflicts_problem(10 ** 6)
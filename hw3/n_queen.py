@@ -1,4 +1,8 @@
 import random
+from bisect import insort
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
 
 class NQPosition:
@@ -8,39 +12,207 @@ class NQPosition:
         self.queens_with_rows = [random.randrange(self.n) for _ in range(self.n)]
         # every queen has it's own column, int in array is row position
 
-    def value(self) -> int:
-        # calculate number of conflicts (pairs of queens that can capture each other)
-        value = 0
+        # queens (columns) on every row, diagonal and anti-diagonal, sorted
+        # diagonal of (column, row) is row - column + n - 1, anti-diagonal is row + column
+        self.lines = ([[] for _ in range(n)], [[] for _ in range(2 * n - 1)], [[] for _ in range(2 * n - 1)])
+        # rightmost queen on every line, -1 if the line is empty
+        self.tops = ([-1] * n, [-1] * (2 * n - 1), [-1] * (2 * n - 1))
         for i, q in enumerate(self.queens_with_rows):
-            for i2 in range(i + 1, self.n):
-                q2 = self.queens_with_rows[i2]
-                # captures horizontally (same row) or captures diagonally
-                if q == q2 or abs(q - q2) == abs(i - i2):
-                    value += 1
-                    break
-        return value
+            for lines, line in zip(self.lines, self.line_ids(i, q)):
+                insort(lines[line], i)
+        for tops, lines in zip(self.tops, self.lines):
+            for line, queens in enumerate(lines):
+                if queens:
+                    tops[line] = queens[-1]
+
+        # a queen is free if no queen right of it is on the same row or diagonal
+        self.free = [self.is_free(i) for i in range(n)]
+        self.free_count = sum(self.free)
+
+    def line_ids(self, queen: int, row: int) -> tuple:
+        return row, row - queen + self.n - 1, row + queen
+
+    def is_free(self, queen: int) -> bool:
+        # queen is free if it is the rightmost queen on all of its lines
+        return all(tops[line] == queen for tops, line in zip(self.tops, self.line_ids(queen, self.queens_with_rows[queen])))
+
+    def value(self) -> int:
+        # number of queens that can capture some queen right of them (the same as counting, for every queen,
+        # whether any later queen is on its row or diagonal); those are exactly the queens that are not free
+        return self.n - self.free_count
 
     def make_move(self, queen_to_move: int, move: int) -> None:
+        old = self.queens_with_rows[queen_to_move]
+        if old == move:
+            return
+        old_lines = self.line_ids(queen_to_move, old)
+        new_lines = self.line_ids(queen_to_move, move)
+
+        # only the moved queen and the two rightmost queens of the changed lines can change being free
+        affected = {queen_to_move}
+        for lines, line in zip(self.lines, old_lines):
+            affected.update(lines[line][-2:])
+        for lines, line in zip(self.lines, new_lines):
+            affected.update(lines[line][-1:])
+        self.free_count -= sum(self.free[q] for q in affected)
+
+        for lines, tops, line in zip(self.lines, self.tops, old_lines):
+            lines[line].remove(queen_to_move)
+            tops[line] = lines[line][-1] if lines[line] else -1
+        for lines, tops, line in zip(self.lines, self.tops, new_lines):
+            insort(lines[line], queen_to_move)
+            tops[line] = lines[line][-1]
         self.queens_with_rows[queen_to_move] = move
 
+        for q in affected:
+            self.free[q] = self.is_free(q)
+        self.free_count += sum(self.free[q] for q in affected)
+
+    def without_queen(self, queen: int) -> tuple:
+        """Get number of free queens on the board without the queen and {queen: is free} of queens that change.
+
+        The next queen becomes the rightmost on lines where the removed queen was the rightmost.
+        """
+        old_lines = self.line_ids(queen, self.queens_with_rows[queen])
+        promoted = {}
+        for lines, line in zip(self.lines, old_lines):
+            queens = lines[line]
+            if queens[-1] == queen and len(queens) > 1:
+                p = queens[-2]
+                # p shares only this line with the queen, so it is free if it's the rightmost on the other two
+                promoted[p] = all(tops[l] == p or l == old for tops, l, old in
+                                  zip(self.tops, self.line_ids(p, self.queens_with_rows[p]), old_lines))
+        return self.free_count - self.free[queen] + sum(promoted.values()), promoted
+
     def best_move(self) -> tuple:
         # find the best move and the value function after making that move
+        # value after a move is counted in O(1) from the rightmost queens of the lines, in the same order
+        # (queen, then row) as trying every move, so ties are resolved the same way
         queen_to_move = 0
         best_move = 0
         value = self.value()
+        n = self.n
+        free = self.free
+        row_tops, diagonal_tops, anti_diagonal_tops = self.tops
 
         for i, q in enumerate(self.queens_with_rows):
-            for move in range(self.n):
-                if move != q:  # new position not the same
-                    self.make_move(i, move)
-                    new_value = self.value()
-                    if new_value < value:  # if better value, remember the move and queen
-                        queen_to_move = i
-                        best_move = move
-                        value = new_value
-                    self.make_move(i, q)  # restore position before move
+            free_without, promoted = self.without_queen(i)
+            if n - free_without - 1 >= value:
+                continue  # even the best placement of queen i can't improve
+
+            shift = n - 1 - i
+            for move in range(n):
+                if move == q:  # new position not the same
+                    continue
+                t1 = row_tops[move]
+                t2 = diagonal_tops[move + shift]
+                t3 = anti_diagonal_tops[move + i]
+                # queen i is free if it is right of all queens on its new lines,
+                # a free queen left of it on one of those lines stops being free
+                new_free = free_without + (t1 < i and t2 < i and t3 < i)
+                if 0 <= t1 < i and promoted.get(t1, free[t1]):
+                    new_free -= 1
+                if 0 <= t2 < i and promoted.get(t2, free[t2]):
+                    new_free -= 1
+                if 0 <= t3 < i and promoted.get(t3, free[t3]):
+                    new_free -= 1
+                new_value = n - new_free
+                if new_value < value:  # if better value, remember the move and queen
+                    queen_to_move = i
+                    best_move = move
+                    value = new_value
         return queen_to_move, best_move, value
 
+    def move_costs(self, queens: list = None) -> np.ndarray:
+        """Get value after every move of the queens (default all) as a matrix, one row per queen.
+
+        Same count as in best_move, done for all rows of the queens at once.
+        Staying in place is not a move, it costs n + 1.
+        """
+        n = self.n
+        queens = list(range(n)) if queens is None else list(queens)
+        columns = np.array(queens, dtype=np.int64)
+        free = np.array(self.free + [False])  # index -1 (empty line) is not free
+
+        # rightmost queens of the rows and diagonals the queens can move to and whether they are free,
+        # row i of column q is row_tops[i], diagonal_tops[i - q + n - 1] and anti_diagonal_tops[i + q]
+        left = []
+        lost = np.zeros((len(queens), n), dtype=np.int32)
+        for line_tops, windows in zip(self.tops, [None, n - 1 - columns, columns]):
+            line_tops = np.array(line_tops, dtype=np.int32)
+            line_free = free[line_tops]
+            if windows is None:
+                t, t_free = line_tops[None, :], line_free[None, :]
+            else:
+                t, t_free = sliding_window_view(line_tops, n)[windows], sliding_window_view(line_free, n)[windows]
+            left.append(t < columns[:, None])
+            # a free queen left of the moved queen on one of its new lines stops being free
+            lost += t_free & left[-1]
+        # queen is free if it is right of all queens on its new lines
+        costs = n + lost - (left[0] & left[1] & left[2])
+
+        removals = [self.without_queen(i) for i in queens]
+        costs -= np.array([free_without for free_without, _ in removals], dtype=np.int32)[:, None]
+        for k, (i, (_, promoted)) in enumerate(zip(queens, removals)):
+            # queens that are free only without queen i are on one cell of each of their lines in column i
+            for p, is_free in promoted.items():
+                if not is_free:
+                    continue
+                row = self.queens_with_rows[p]
+                for tops, line, move in zip(self.tops, self.line_ids(p, row), (row, row - p + i, row + p - i)):
+                    if 0 <= move < n and tops[line] == p:
+                        costs[k, move] += 1
+        costs[np.arange(len(queens)), [self.queens_with_rows[i] for i in queens]] = n + 1
+        return costs
+
+    def improving_queens(self, value: int, start: int = 0, stop: int = None, sideways: bool = False) -> list:
+        """Get queens start...stop-1 that can reach a value below (or equal to, for sideways) the given value."""
+        n = self.n
+        return [i for i in range(start, n if stop is None else min(stop, n))
+                if n - self.without_queen(i)[0] - 1 < value + sideways]
+
+    def best_move_batched(self, block: int = 64) -> tuple:
+        """Get the same move as best_move from cost matrices of blocks of queens, picked with argmin."""
+        n = self.n
+        queen_to_move = 0
+        best_move = 0
+        value = self.value()
+        for start in range(0, n, block):
+            # queens that can't beat the best move so far are skipped, like in best_move
+            queens = self.improving_queens(value, start, start + block)
+            if not queens:
+                continue
+            costs = self.move_costs(queens)
+            i, move = np.unravel_index(np.argmin(costs), costs.shape)
+            if costs[i, move] < value:
+                queen_to_move, best_move, value = queens[i], int(move), int(costs[i, move])
+        return queen_to_move, best_move, value
+
+    def first_improvement(self, block: int = 8) -> tuple:
+        """Get the first move (queen, then row) that improves the value, checking a block of queens at once."""
+        value = self.value()
+        for start in range(0, self.n, block):
+            queens = self.improving_queens(value, start, start + block)
+            if not queens:
+                continue
+            costs = self.move_costs(queens)
+            better = np.flatnonzero(costs < value)
+            if better.size:
+                i, move = divmod(int(better[0]), self.n)
+                return queens[i], move, int(costs[i, move])
+        return 0, 0, value
+
+    def sideways_move(self):
+        """Get a random move keeping the value, None if there is none."""
+        value = self.value()
+        queens = self.improving_queens(value, sideways=True)
+        costs = self.move_costs(queens)
+        moves = np.flatnonzero(costs == value)
+        if not moves.size:
+            return
+        i, move = divmod(int(moves[random.randrange(moves.size)]), self.n)
+        return queens[i], move
+
     def print_board(self) -> None:
         board = []
         for row in range(self.n):
@@ -53,17 +225,26 @@ class NQPosition:
         print()
 
 
-def hill_climbing(pos: NQPosition):
+def hill_climbing(pos: NQPosition, strategy: str = "best", max_sideways: int = 0):
+    # strategy "best" and "batched" take the best move (same move), "first" takes the first improving one,
+    # on a plateau up to max_sideways moves in a row keeping the value are made before giving up
+    moves = {"best": pos.best_move, "batched": pos.best_move_batched, "first": pos.first_improvement}
     curr_value = pos.value()
+    sideways = 0
     while True:
-        queen_to_move, move, new_value = pos.best_move()
-        if new_value >= curr_value:
+        queen_to_move, move, new_value = moves[strategy]()
+        if new_value < curr_value:
+            # position improves, keep searching
+            sideways = 0
+        elif curr_value and sideways < max_sideways and (sideways_move := pos.sideways_move()) is not None:
+            queen_to_move, move = sideways_move
+            new_value = curr_value
+            sideways += 1
+        else:
             # no improvement, give up
             return pos, curr_value
-        else:
-            # position improves, keep searching
-            curr_value = new_value
-            pos.make_move(queen_to_move, move)
+        curr_value = new_value
+        pos.make_move(queen_to_move, move)
 
 
 def n_queen_problem(n: int):
@@ -0,0 +1,105 @@
+import os
+import random
+import statistics
+import time
+from multiprocessing import Event, Process, Queue, Value
+from queue import Empty
+
+from min_conflicts import is_solution
+from n_queen import NQPosition, hill_climbing
+
+
+def restart_worker(n: int, seed: str, restarts: Value, max_restarts: int, found: Event, results: Queue) -> None:
+    """Run hill climbing restarts until a solution is found, by anyone, or the shared restart cap is reached."""
+    random.seed(seed)  # every worker process has its own random generator
+    while not found.is_set():
+        with restarts.get_lock():
+            if restarts.value >= max_restarts:
+                break
+            restarts.value += 1
+        pos, value = hill_climbing(NQPosition(n))
+        if value == 0:
+            results.put(pos.queens_with_rows)
+            found.set()
+            return
+    results.put(None)
+
+
+def portfolio(n: int, workers: int = None, seed: int = 0, max_restarts: int = 200, timeout: float = None) -> tuple:
+    """Solve n-queens with hill climbing restarts in parallel worker processes.
+
+    The first solution stops the other workers, restarts of all workers together are capped by max_restarts.
+    Returns (queens_with_rows or None, number of restarts started).
+    Raises TimeoutError if timeout seconds pass before a solution is found or all workers reach the cap.
+    """
+    workers = workers or os.cpu_count()
+    restarts = Value('i', 0)
+    found = Event()
+    results = Queue()
+    processes = [Process(target=restart_worker, args=(n, f"{seed}-{i}", restarts, max_restarts, found, results))
+                 for i in range(workers)]
+    for process in processes:
+        process.start()
+
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    solution = None
+    timed_out = False
+    for _ in range(workers):
+        try:
+            solution = results.get(timeout=None if deadline is None else max(0, deadline - time.perf_counter()))
+        except Empty:
+            timed_out = True
+            break
+        if solution is not None:
+            break
+    found.set()
+    for process in processes:
+        process.terminate()  # cancel workers still climbing
+        process.join()
+    if timed_out:
+        raise TimeoutError(f"No solution for N={n} within {timeout} s")
+    # a worker can be terminated while holding the lock of restarts, so it is read without it
+    return solution, restarts.get_obj().value
+
+
+def serial(n: int, seed: int = 0, max_restarts: int = 200) -> tuple:
+    """Solve n-queens with hill climbing restarts one after another, returns the same as portfolio."""
+    random.seed(seed)
+    for restart in range(1, max_restarts + 1):
+        pos, value = hill_climbing(NQPosition(n))
+        if value == 0:
+            return pos.queens_with_rows, restart
+    return None, max_restarts
+
+
+def compare_portfolio(sizes: list, seeds: int = 20, workers: int = None, max_restarts: int = 200):
+    """Print time-to-solution distributions of the serial loop and the portfolio over many seeds."""
+    workers = workers or os.cpu_count()
+    len1 = 22
+    print(f"{workers} workers, {seeds} seeds, at most {max_restarts} restarts\n")
+    for n in sizes:
+        print(f"N={n}")
+        for name, solve in [("serial", lambda s: serial(n, s, max_restarts)),
+                            ("portfolio", lambda s: portfolio(n, workers, s, max_restarts))]:
+            times = []
+            restarts = []
+            failed = 0
+            for seed in range(seeds):
+                start = time.perf_counter()
+                solution, restart_count = solve(seed)
+                times.append(time.perf_counter() - start)
+                restarts.append(restart_count)
+                if solution is None:
+                    failed += 1
+                else:
+                    assert is_solution(solution), f"Wrong solution for N={n}, seed {seed}"
+            # quantiles need at least two times
+            p90 = f"{round(statistics.quantiles(times, n=10)[-1], 4)} s" if len(times) > 1 else "-"
+            print(f"{name + ':': <{len1}} median: {round(statistics.median(times), 4)} s  "
+                  f"p90: {p90}  max: {round(max(times), 4)} s  "
+                  f"restarts: {round(statistics.mean(restarts), 1)}  failed: {failed}")
+        print()
+
+
+if __name__ == '__main__':
+    compare_portfolio([8, 20, 50, 100, 200])
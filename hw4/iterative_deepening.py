@@ -0,0 +1,193 @@
+import random
+import statistics
+import time
+
+from minimax import PASS, PLAYER_1, PLAYER_2, ROLL, minimax_ai
+
+# bounds of exp_minimax values: a loss and a win
+LOWEST = -2000
+HIGHEST = 2000
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class IterativeDeepening:
+
+    # exp_minimax searched with depth 1, 2, 3... until the deadline, the last finished depth gives the move.
+    # decision nodes use alpha-beta and try first the move that was best for the state in the previous depth,
+    # chance nodes use Star1: every child value has known bounds (see value_bounds), so after some dice
+    # the average can be known to stay below alpha or above beta and the rest of the dice are skipped.
+
+    def __init__(self, deadline_ms: float = 50, max_depth: int = 100):
+        """Class constructor."""
+        self.deadline_ms = deadline_ms
+        self.max_depth = max_depth
+        self.deadline = None
+        self.best_moves = {}  # (turn, rolled, my_points, opp_points) -> best move found so far
+        self.nodes = 0
+
+    def decide(self, turn: int, rolled: int, my_points: int, opp_points: int, stats: dict = None) -> int:
+        """Get the move of the deepest search finished before the deadline, like minimax_ai.
+
+        Nodes searched per depth are written to stats["nodes_per_depth"] and the depth reached to
+        stats["depth"] if stats is given.
+        """
+        self.deadline = time.perf_counter() + self.deadline_ms / 1000
+        self.best_moves = {}
+        nodes_per_depth = []
+        decision = ROLL
+        for depth in range(1, self.max_depth + 1):
+            self.nodes = 0
+            try:
+                decision = self.decide_depth(turn, rolled, my_points, opp_points, depth)
+            except SearchTimeout:
+                break
+            nodes_per_depth.append(self.nodes)
+        if stats is not None:
+            stats["nodes_per_depth"] = nodes_per_depth
+            stats["depth"] = len(nodes_per_depth)
+        return decision
+
+    def decide_depth(self, turn: int, rolled: int, my_points: int, opp_points: int, depth: int) -> int:
+        """Get the move of minimax_ai searching with the given depth.
+
+        The previously better move is searched with a full window, the other one only needs to be
+        compared to it. Like in minimax_ai, PASS wins ties and the player in turn is searched as PLAYER_1.
+        """
+        turn = PLAYER_1
+        root = (turn, rolled, my_points, opp_points)
+        if self.best_moves.get(root) == ROLL:
+            roll_value = self.search(turn, True, rolled, my_points, opp_points, depth, LOWEST, HIGHEST)
+            pass_value = self.search(-turn, False, 0, my_points, opp_points, depth, LOWEST, roll_value)
+        else:
+            pass_value = self.search(-turn, False, 0, my_points, opp_points, depth, LOWEST, HIGHEST)
+            roll_value = self.search(turn, True, rolled, my_points, opp_points, depth, pass_value, HIGHEST)
+        decision = PASS if pass_value >= roll_value else ROLL
+        self.best_moves[root] = decision
+        return decision
+
+    def search(self, turn: int, chance: bool, rolled: int, my_points: int, opp_points: int, depth: int,
+               alpha: float, beta: float) -> float:
+        """Get exp_minimax value, or a bound of it that is <= alpha or >= beta if it is outside the window."""
+        self.nodes += 1
+        if not self.nodes & 15 and self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        depth -= 1
+        if my_points >= 100 > opp_points:
+            return 2000
+        elif opp_points >= 100 > my_points:
+            return -2000
+        elif depth == 0:
+            return my_points - opp_points * 0.7
+
+        if not chance:
+            key = (turn, rolled, my_points, opp_points)
+            moves = [PASS, ROLL] if self.best_moves.get(key) == PASS else [ROLL, PASS]
+            best_value = best_move = None
+            for move in moves:
+                if move == ROLL:
+                    value = self.search(turn, True, rolled, my_points, opp_points, depth, alpha, beta)
+                else:
+                    value = self.search(-turn, False, 0, my_points, opp_points, depth, alpha, beta)
+                if turn == PLAYER_1 and (best_value is None or value > best_value):
+                    best_value, best_move = value, move
+                    alpha = max(alpha, value)
+                elif turn == PLAYER_2 and (best_value is None or value < best_value):
+                    best_value, best_move = value, move
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    break
+            self.best_moves[key] = best_move
+            return best_value
+
+        # chance node, same children as in exp_minimax
+        if turn == PLAYER_1:
+            children = [(-turn, False, 0, my_points - rolled, opp_points)]
+            children += [(turn, True, rolled + roll, my_points + roll, opp_points) for roll in [2, 3, 4, 5, 6]]
+        else:
+            children = [(-turn, False, 0, my_points, opp_points - rolled)]
+            children += [(turn, True, rolled + roll, my_points, opp_points + roll) for roll in [2, 3, 4, 5, 6]]
+        bounds = [value_bounds(*child, depth) for child in children]
+        total = 0
+        for i, child in enumerate(children):
+            rest = bounds[i + 1:]
+            # window of this child that keeps the average inside (alpha, beta) with the best and worst
+            # possible values of the remaining children
+            child_alpha = 6 * alpha - total - sum(high for _, high in rest)
+            child_beta = 6 * beta - total - sum(low for low, _ in rest)
+            value = self.search(*child, depth, child_alpha, child_beta)
+            total += value
+            if value <= child_alpha:
+                return (total + sum(high for _, high in rest)) / 6
+            if value >= child_beta:
+                return (total + sum(low for low, _ in rest)) / 6
+        return total / 6
+
+
+def value_bounds(turn: int, chance: bool, rolled: int, my_points: int, opp_points: int, depth: int) -> tuple:
+    """Get (lowest, highest) exp_minimax value of a state searched with depth.
+
+    Without a reachable win the value is a leaf evaluation: points grow at most 6 per level and
+    never drop below what the players have banked.
+    """
+    if max(my_points, opp_points) + 6 * depth >= 100:
+        return LOWEST, HIGHEST
+    my_banked = my_points - rolled if turn == PLAYER_1 else my_points
+    opp_banked = opp_points - rolled if turn == PLAYER_2 else opp_points
+    return my_banked - (opp_points + 6 * depth) * 0.7, my_points + 6 * depth - opp_banked * 0.7
+
+
+def timed_minimax_ai(turn: int, rolled: int, my_points: int, opp_points: int, deadline_ms: float = 50,
+                     stats: dict = None) -> int:
+    # minimax_ai searching as deep as it can in deadline_ms milliseconds
+    return IterativeDeepening(deadline_ms).decide(turn, rolled, my_points, opp_points, stats)
+
+
+def compare_deadlines(deadlines: list, nr_of_states: int = 100, seed: int = 0):
+    """Print reached depths, nodes per depth and decision latency for every deadline.
+
+    Also checks that the search with fixed depth 5 decides the same as minimax_ai.
+    """
+    rng = random.Random(seed)
+    states = [(rng.choice([PLAYER_1, PLAYER_2]), rng.randrange(0, 30), rng.randrange(0, 100), rng.randrange(0, 100))
+              for _ in range(nr_of_states)]
+
+    fixed = IterativeDeepening(max_depth=5)
+    same = 0
+    pruned_nodes = plain_nodes = 0
+    for state in states:
+        stats = {}
+        same += fixed.decide_depth(*state, 5) == minimax_ai(*state, table=None, stats=stats)
+        pruned_nodes += fixed.nodes
+        plain_nodes += stats["nodes"]
+        fixed.nodes = 0
+    print(f"Depth 5: {same}/{nr_of_states} same decisions as minimax_ai, nodes: {pruned_nodes} "
+          f"(minimax_ai without table: {plain_nodes})\n")
+
+    len1 = 14
+    for deadline in deadlines:
+        depths = []
+        latencies = []
+        nodes_per_depth = {}
+        for state in states:
+            stats = {}
+            start = time.perf_counter()
+            timed_minimax_ai(*state, deadline_ms=deadline, stats=stats)
+            latencies.append((time.perf_counter() - start) * 1000)
+            depths.append(stats["depth"])
+            for depth, nodes in enumerate(stats["nodes_per_depth"], 1):
+                nodes_per_depth.setdefault(depth, []).append(nodes)
+        quantiles = statistics.quantiles(latencies, n=100)
+        print(f"{str(deadline) + ' ms:': <{len1}} depth: median {statistics.median(depths)}, "
+              f"min {min(depths)}, max {max(depths)}  latency: median {round(statistics.median(latencies), 2)} ms, "
+              f"p99 {round(quantiles[-1], 2)} ms, max {round(max(latencies), 2)} ms")
+        print(f"{'': <{len1}} mean nodes per depth: "
+              + ", ".join(f"{depth}: {round(statistics.mean(nodes))}" for depth, nodes in nodes_per_depth.items()))
+    print()
+
+
+if __name__ == '__main__':
+    compare_deadlines([5, 20, 100])
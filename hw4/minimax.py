@@ -1,4 +1,6 @@
 import random
+import time
+from collections import OrderedDict
 
 PLAYER_1 = -1
 PLAYER_2 = 1
@@ -7,7 +9,8 @@ ROLL = 0
 PASS = 1
 
 
-def pig_game(player1_func, player2_func) -> int:
+def pig_game(player1_func, player2_func, dice=None) -> int:
+    # dice is an iterator of die rolls, random.randint is used if it is not given
     rolled = 0
     turn = PLAYER_2
     player1_points = player2_points = 0
@@ -22,7 +25,7 @@ def pig_game(player1_func, player2_func) -> int:
                 rolled = 0
                 turn = PLAYER_2
             else:
-                dieroll = random.randint(1, 6)
+                dieroll = random.randint(1, 6) if dice is None else next(dice)
                 # print("-- Player 1 rolled...", dieroll)
                 if dieroll == 1:
                     player1_points -= rolled  # lose all points again
@@ -38,7 +41,7 @@ def pig_game(player1_func, player2_func) -> int:
                 rolled = 0
                 turn = PLAYER_1
             else:
-                dieroll = random.randint(1, 6)
+                dieroll = random.randint(1, 6) if dice is None else next(dice)
                 # print("-- Player 2 rolled...", dieroll)
                 if dieroll == 1:
                     player2_points -= rolled  # lose all points again
@@ -61,18 +64,67 @@ def dummy_ai(turn, rolled, my_points, opp_points):
         return PASS
 
 
-def minimax_ai(turn: int, rolled: int, my_points: int, opp_points: int) -> int:
+class TranspositionTable:
+
+    # values of searched states, the least recently used state is dropped when the table is full.
+    # value of a state only depends on the state and remaining depth, so it can be reused
+    # between different decisions and games.
+
+    def __init__(self, max_size: int = 2 ** 20):
+        """Class constructor."""
+        self.max_size = max_size
+        self.values = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple):
+        value = self.values.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.values.move_to_end(key)
+        return value
+
+    def put(self, key: tuple, value: float) -> None:
+        self.values[key] = value
+        self.values.move_to_end(key)
+        if len(self.values) > self.max_size:
+            self.values.popitem(last=False)
+
+    def clear(self) -> None:
+        self.values.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+transposition_table = TranspositionTable()
+
+
+def minimax_ai(turn: int, rolled: int, my_points: int, opp_points: int, depth: int = 5,
+               table: TranspositionTable = transposition_table, stats: dict = None) -> int:
     # this is the top level of search
     # we search all possible moves
     # (PASS and ROLL in case of the Pig game)
     # and pick the one that returns the highest minimax estimate
-    pass_value = exp_minimax(-turn, False, 0, my_points, opp_points)
-    roll_value = exp_minimax(turn, True, rolled, my_points, opp_points)
+    # searched states are remembered in table (None to search without it),
+    # number of visited nodes is added to stats["nodes"] if stats is given
+    # my_points and opp_points are from the view of the player in turn, so the search always sees it as
+    # PLAYER_1, the maximizer, whichever seat it plays in
+    turn = PLAYER_1
+    pass_value = exp_minimax(-turn, False, 0, my_points, opp_points, depth, table, stats)
+    roll_value = exp_minimax(turn, True, rolled, my_points, opp_points, depth, table, stats)
     # print(f"MINIMAX_AI------- pass value: {pass_value} roll_value: {roll_value}")
     return PASS if pass_value >= roll_value else ROLL
 
 
-def exp_minimax(turn: int, chance: bool, rolled: int, my_points: int, opp_points: int, depth: int = 5) -> float:
+def exp_minimax(turn: int, chance: bool, rolled: int, my_points: int, opp_points: int, depth: int = 5,
+                table: TranspositionTable = None, stats: dict = None) -> float:
+    if stats is not None:
+        stats["nodes"] = stats.get("nodes", 0) + 1
+
     # update remaining depth as we go deeper in the search tree
     depth -= 1
 
@@ -88,17 +140,31 @@ def exp_minimax(turn: int, chance: bool, rolled: int, my_points: int, opp_points
     elif depth == 0:
         return my_points - opp_points * 0.7
 
+    if table is None:
+        return expand(turn, chance, rolled, my_points, opp_points, depth, table, stats)
+    key = (turn, chance, rolled, my_points, opp_points, depth)
+    value = table.get(key)
+    if value is None:
+        value = expand(turn, chance, rolled, my_points, opp_points, depth, table, stats)
+        table.put(key, value)
+    return value
+
+
+def expand(turn: int, chance: bool, rolled: int, my_points: int, opp_points: int, depth: int,
+           table: TranspositionTable = None, stats: dict = None) -> float:
+    # value of a state that is not a leaf, depth is already updated
+
     # case 2: AI's turn (and NOT a chance node):
     # return max value of possible moves (recursively) - roll or pass
     if turn == PLAYER_1 and not chance:
-        return max(exp_minimax(turn, True, rolled, my_points, opp_points, depth),  # ROLL
-                   exp_minimax(-turn, False, 0, my_points, opp_points, depth))  # PASS
+        return max(exp_minimax(turn, True, rolled, my_points, opp_points, depth, table, stats),  # ROLL
+                   exp_minimax(-turn, False, 0, my_points, opp_points, depth, table, stats))  # PASS
 
     # case 3: player's turn:
     # return min value (assume optimal action from player)
     if turn == PLAYER_2 and not chance:
-        return min(exp_minimax(turn, True, rolled, my_points, opp_points, depth),  # ROLL
-                   exp_minimax(-turn, False, 0, my_points, opp_points, depth))  # PASS
+        return min(exp_minimax(turn, True, rolled, my_points, opp_points, depth, table, stats),  # ROLL
+                   exp_minimax(-turn, False, 0, my_points, opp_points, depth, table, stats))  # PASS
 
     # case 4: chance node:
     # return average of all dice rolls
@@ -107,18 +173,48 @@ def exp_minimax(turn: int, chance: bool, rolled: int, my_points: int, opp_points
         results = []
 
         if turn == PLAYER_1:
-            results.append(exp_minimax(-turn, False, 0, my_points - rolled, opp_points, depth))
+            results.append(exp_minimax(-turn, False, 0, my_points - rolled, opp_points, depth, table, stats))
             for roll in [2, 3, 4, 5, 6]:
-                results.append(exp_minimax(turn, True, rolled + roll, my_points + roll, opp_points, depth))
+                results.append(exp_minimax(turn, True, rolled + roll, my_points + roll, opp_points, depth, table,
+                                           stats))
             return sum(results) / 6
 
         if turn == PLAYER_2:
-            results.append(exp_minimax(-turn, False, 0, my_points, opp_points - rolled, depth))
+            results.append(exp_minimax(-turn, False, 0, my_points, opp_points - rolled, depth, table, stats))
             for roll in [2, 3, 4, 5, 6]:
-                results.append(exp_minimax(turn, True, rolled + roll, my_points, opp_points + roll, depth))
+                results.append(exp_minimax(turn, True, rolled + roll, my_points, opp_points + roll, depth, table,
+                                           stats))
             return sum(results) / 6
 
 
+def compare_table(depths: list, nr_of_states: int = 200, seed: int = 0):
+    """Compare minimax_ai decisions, visited nodes and time with and without the transposition table.
+
+    States are random (turn, rolled, my_points, opp_points) positions, the table is shared by all
+    decisions of one depth like in a game.
+    """
+    rng = random.Random(seed)
+    states = [(rng.choice([PLAYER_1, PLAYER_2]), rng.randrange(0, 30), rng.randrange(0, 100), rng.randrange(0, 100))
+              for _ in range(nr_of_states)]
+    len1 = 12
+    for depth in depths:
+        print(f"Depth {depth}, {nr_of_states} decisions")
+        decisions = {}
+        for name, table in [("no table:", None), ("table:", TranspositionTable())]:
+            stats = {}
+            start = time.time()
+            decisions[name] = [minimax_ai(*state, depth=depth, table=table, stats=stats) for state in states]
+            end = time.time()
+            line = f"{name: <{len1}} nodes: {stats['nodes']: <10} time: {round(end - start, 4)} s"
+            if table is not None:
+                hit_rate = table.hits / max(1, table.hits + table.misses) * 100
+                line += f"  hits: {table.hits}  misses: {table.misses}  hit rate: {round(hit_rate, 1)}%  " \
+                        f"size: {len(table)}"
+            print(line)
+        same = sum(a == b for a, b in zip(decisions["no table:"], decisions["table:"]))
+        print(f"Same decisions: {same}/{nr_of_states}\n")
+
+
 if __name__ == '__main__':
     player1_wins = player2_wins = 0
     nr_of_games = 200
@@ -129,3 +225,7 @@ if __name__ == '__main__':
             # print("won")
             player1_wins += 1
     print(f"Minimax won {int(player1_wins * 100 / nr_of_games)}%")
+    table = transposition_table
+    print(f"Transposition table: {table.hits} hits, {table.misses} misses, {len(table)} states\n")
+
+    compare_table([5, 7])
@@ -0,0 +1,99 @@
+import os
+import time
+
+import numpy as np
+
+from minimax import PASS, ROLL, dummy_ai, minimax_ai, pig_game, PLAYER_1
+
+GOAL = 100
+POLICY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pig_policy.npy")
+
+
+def value_iteration(goal: int = GOAL, tolerance: float = 1e-9) -> tuple:
+    """Get win probability and optimal decision of the player to move in every state.
+
+    State is (banked, opp_points, rolled) where banked = my_points - rolled is what the player keeps
+    when passing, both arrays are indexed [banked, opp_points, rolled] and only banked + rolled < goal
+    are real states. Rolling a 1 loses rolled and the turn, passing gives the turn to the opponent,
+    reaching the goal wins at once like in pig_game.
+    Values inside a turn only depend on bigger rolled values, so every iteration sweeps rolled downwards
+    for all (banked, opp_points) at once and only the values at the start of a turn are iterated.
+    Returns (win probabilities, roll decisions as bools).
+    """
+    banked, opp = np.indices((goal, goal))
+    start = np.zeros((goal, goal))  # [player, opponent] at the start of a turn
+    while True:
+        # rolling r in 2...6 gives rolled + r, the padding of ones is a win
+        wins = np.ones((goal, goal, goal + 6))
+        roll = np.zeros((goal, goal, goal), dtype=bool)
+        # after a 1 the opponent starts with (opp, banked)
+        lose_value = (1 - start.T) / 6
+        for rolled in range(goal - 1, -1, -1):
+            points = banked + rolled
+            won = points >= goal
+            # after passing the opponent starts with (opp, points)
+            pass_value = np.where(won, 1.0, 1 - start[opp, np.minimum(points, goal - 1)])
+            roll_value = lose_value + wins[:, :, rolled + 2:rolled + 7].sum(axis=2) / 6
+            wins[:, :, rolled] = np.where(won, 1.0, np.maximum(pass_value, roll_value))
+            roll[:, :, rolled] = roll_value > pass_value
+        change = np.abs(wins[:, :, 0] - start).max()
+        start = wins[:, :, 0].copy()
+        if change < tolerance:
+            return wins[:, :, :goal], roll
+
+
+def save_policy(file: str = POLICY_FILE, goal: int = GOAL) -> np.ndarray:
+    """Solve the game and save roll decisions bit-packed, one bit per (banked, opp_points, rolled) state.
+
+    Returns win probabilities of all states.
+    """
+    wins, roll = value_iteration(goal)
+    np.save(file, np.packbits(roll.ravel()))
+    return wins
+
+
+def load_policy(file: str = POLICY_FILE) -> np.ndarray:
+    """Load packed decisions with mmap, solve and save them first if missing."""
+    if not os.path.exists(file):
+        save_policy(file)
+    return np.load(file, mmap_mode="r")
+
+
+policy = None
+
+
+def optimal_ai(turn: int, rolled: int, my_points: int, opp_points: int) -> int:
+    # decision maximizing the probability to win, looked up from the solved table
+    global policy
+    if policy is None:
+        policy = load_policy()
+    index = ((my_points - rolled) * GOAL + opp_points) * GOAL + rolled
+    return ROLL if policy[index >> 3] >> (7 - (index & 7)) & 1 else PASS
+
+
+def compare_ai(opponents: dict, nr_of_games: int = 1000):
+    """Play optimal_ai against every opponent, half of the games starting first, and print win rates.
+
+    Opponents play from both seats, so they must decide from my_points and opp_points alone.
+    """
+    start = time.time()
+    load_policy()
+    print(f"Policy loaded in {round(time.time() - start, 4)} s")
+    for name, opponent in opponents.items():
+        wins = 0
+        start = time.time()
+        for i in range(nr_of_games):
+            # pig_game lets PLAYER_2 start
+            if i % 2:
+                wins += pig_game(optimal_ai, opponent) == PLAYER_1
+            else:
+                wins += pig_game(opponent, optimal_ai) != PLAYER_1
+        end = time.time()
+        print(f"Optimal against {name}: won {round(wins * 100 / nr_of_games, 1)}% in {round(end - start, 4)} s")
+
+
+if __name__ == '__main__':
+    start = time.time()
+    wins = save_policy()
+    print(f"Solved in {round(time.time() - start, 4)} s, first player wins {round(wins[0, 0, 0] * 100, 2)}%")
+    compare_ai({"dummy": dummy_ai, "minimax": minimax_ai})
@@ -0,0 +1,114 @@
+import time
+
+import numpy as np
+
+from minimax import PASS, PLAYER_1, PLAYER_2, ROLL, dummy_ai, pig_game
+from pig_solver import GOAL, load_policy, optimal_ai
+from tournament import confidence_interval
+
+
+def threshold_policy(threshold: int):
+    """Get vectorized policy rolling until rolled reaches threshold, dummy_ai is threshold_policy(21)."""
+    def decide(turn: np.ndarray, rolled: np.ndarray, my_points: np.ndarray, opp_points: np.ndarray) -> np.ndarray:
+        return np.where(rolled < threshold, ROLL, PASS)
+    return decide
+
+
+packed_policy = None
+
+
+def optimal_policy(turn: np.ndarray, rolled: np.ndarray, my_points: np.ndarray, opp_points: np.ndarray) -> np.ndarray:
+    """Vectorized optimal_ai, decisions of all games are looked up from the solved table at once."""
+    global packed_policy
+    if packed_policy is None:
+        packed_policy = load_policy()
+    index = ((my_points.astype(np.int64) - rolled) * GOAL + opp_points) * GOAL + rolled
+    return np.where(packed_policy[index >> 3] >> (7 - (index & 7)) & 1, ROLL, PASS)
+
+
+def simulate(player1_policy, player2_policy, games: int = 100000, seed: int = 0, max_steps: int = 100000) -> tuple:
+    """Play many games in lockstep with vectorized policies, returns (player 1 wins, player 2 wins).
+
+    Rules are the same as in pig_game (PLAYER_2 starts), policies get arrays of the same arguments as
+    the AI functions and return an array of ROLL/PASS. Games still running after max_steps count for nobody.
+    """
+    rng = np.random.default_rng(seed)
+    # points are kept from the view of the player in turn, they are swapped when the turn changes
+    my_points = np.zeros(games, dtype=np.int16)
+    opp_points = np.zeros(games, dtype=np.int16)
+    rolled = np.zeros(games, dtype=np.int16)
+    turn = np.full(games, PLAYER_2, dtype=np.int16)
+    player1_wins = player2_wins = 0
+
+    for _ in range(max_steps):
+        if not turn.size:
+            break
+        first = turn == PLAYER_1
+        # cheap policies are simply asked about every game
+        decision = np.where(first, player1_policy(turn, rolled, my_points, opp_points),
+                            player2_policy(turn, rolled, my_points, opp_points))
+        roll = decision == ROLL
+
+        dieroll = rng.integers(1, 7, turn.size, dtype=np.int16)
+        keeps_rolling = roll & (dieroll != 1)
+        my_points = np.where(keeps_rolling, my_points + dieroll, np.where(roll, my_points - rolled, my_points))
+        rolled = np.where(keeps_rolling, rolled + dieroll, 0).astype(np.int16)
+
+        # only the player in turn can reach 100
+        won = my_points >= 100
+        if won.any():
+            player1_won = int((won & first).sum())
+            player1_wins += player1_won
+            player2_wins += int(won.sum()) - player1_won
+            running = ~won
+            my_points, opp_points, rolled = my_points[running], opp_points[running], rolled[running]
+            turn, keeps_rolling = turn[running], keeps_rolling[running]
+
+        my_points, opp_points = np.where(keeps_rolling, my_points, opp_points), \
+            np.where(keeps_rolling, opp_points, my_points)
+        turn = np.where(keeps_rolling, turn, -turn).astype(np.int16)
+    return player1_wins, player2_wins
+
+
+def compare_with_pig_game(games: int = 20000):
+    """Compare win rates and speed of simulate and pig_game for the same policies."""
+    len1 = 22
+    pairs = [("dummy vs dummy", dummy_ai, dummy_ai, threshold_policy(21), threshold_policy(21)),
+             ("optimal vs dummy", optimal_ai, dummy_ai, optimal_policy, threshold_policy(21))]
+    for name, ai1, ai2, policy1, policy2 in pairs:
+        print(name)
+        start = time.perf_counter()
+        wins = sum(pig_game(ai1, ai2) == PLAYER_1 for _ in range(games))
+        pig_game_time = time.perf_counter() - start
+        start = time.perf_counter()
+        simulated_wins, _ = simulate(policy1, policy2, games * 10)
+        simulate_time = time.perf_counter() - start
+
+        for label, nr_of_games, player1_wins, total in [("pig_game:", games, wins, pig_game_time),
+                                                        ("simulate:", games * 10, simulated_wins, simulate_time)]:
+            low, high = confidence_interval(player1_wins, nr_of_games)
+            print(f"{label: <{len1}} player 1 won {round(player1_wins * 100 / nr_of_games, 2)}% "
+                  f"[{round(low * 100, 2)}%, {round(high * 100, 2)}%]  {round(nr_of_games / total)} games/s")
+        print()
+
+
+def sweep_thresholds(thresholds: list, opponent=optimal_policy, games: int = 100000):
+    """Print win rate of every threshold policy against the opponent, both starting half of the games."""
+    len1 = 16
+    for threshold in thresholds:
+        policy = threshold_policy(threshold)
+        # PLAYER_2 starts
+        first_wins, _ = simulate(policy, opponent, games // 2, seed=threshold)
+        _, second_wins = simulate(opponent, policy, games // 2, seed=threshold + 1000)
+        wins = first_wins + second_wins
+        low, high = confidence_interval(wins, games)
+        print(f"{'threshold ' + str(threshold) + ':': <{len1}} won {round(wins * 100 / games, 2)}% "
+              f"[{round(low * 100, 2)}%, {round(high * 100, 2)}%]")
+    print()
+
+
+if __name__ == '__main__':
+    compare_with_pig_game()
+    start = time.perf_counter()
+    sweep_thresholds(range(10, 36))
+    print(f"Sweep done in {round(time.perf_counter() - start, 2)} s")
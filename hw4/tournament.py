@@ -0,0 +1,113 @@
+import itertools
+import math
+import os
+import random
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from minimax import PLAYER_1, dummy_ai, minimax_ai, pig_game
+from pig_solver import load_policy, optimal_ai
+
+# AIs by name, workers look them up here so tasks only carry names
+AIS = {
+    "dummy": dummy_ai,
+    "minimax": minimax_ai,
+    "optimal": optimal_ai,
+}
+
+
+def dice_stream(rng: np.random.Generator, batch: int = 2 ** 16):
+    """Get die rolls drawn batch at a time."""
+    while True:
+        yield from rng.integers(1, 7, batch).tolist()
+
+
+def timed(func, clock: list):
+    """Get AI function adding the number of decisions and the time spent on them to clock."""
+    def decide(turn: int, rolled: int, my_points: int, opp_points: int) -> int:
+        start = time.perf_counter()
+        decision = func(turn, rolled, my_points, opp_points)
+        clock[1] += time.perf_counter() - start
+        clock[0] += 1
+        return decision
+    return decide
+
+
+def play_games(task: tuple) -> tuple:
+    """Play one (first AI name, second AI name, number of games, seed) task in a worker.
+
+    Both AIs start half of the games. Returns the names, wins of the first AI, number of games
+    and [decisions, seconds] of both AIs.
+    """
+    name1, name2, games, seed = task
+    random.seed(seed)
+    dice = dice_stream(np.random.default_rng(seed))
+    clock1 = [0, 0.0]
+    clock2 = [0, 0.0]
+    ai1 = timed(AIS[name1], clock1)
+    ai2 = timed(AIS[name2], clock2)
+    wins = 0
+    for i in range(games):
+        # pig_game lets PLAYER_2 start
+        if i % 2:
+            wins += pig_game(ai1, ai2, dice) == PLAYER_1
+        else:
+            wins += pig_game(ai2, ai1, dice) != PLAYER_1
+    return name1, name2, wins, games, clock1, clock2
+
+
+def confidence_interval(wins: int, games: int, z: float = 1.96) -> tuple:
+    """Get Wilson score interval of the win rate, 95% by default."""
+    rate = wins / games
+    center = (rate + z * z / (2 * games)) / (1 + z * z / games)
+    margin = z * math.sqrt(rate * (1 - rate) / games + z * z / (4 * games * games)) / (1 + z * z / games)
+    return center - margin, center + margin
+
+
+def tournament(names: list, games: int = 10000, processes: int = None, chunk: int = 1000, seed: int = 0) -> dict:
+    """Play games between every pair of the named AIs with a process pool and print the results.
+
+    Games of a pair are split into tasks of chunk games, every task gets its own seed.
+    Returns {(name1, name2): wins of name1} and prints win rates with 95% confidence intervals,
+    games per second and time per decision of every AI.
+    """
+    tasks = []
+    for name1, name2 in itertools.combinations(names, 2):
+        for start in range(0, games, chunk):
+            tasks.append((name1, name2, min(chunk, games - start)))
+    seeds = np.random.SeedSequence(seed).generate_state(len(tasks))
+    tasks = [task + (int(task_seed),) for task, task_seed in zip(tasks, seeds)]
+
+    if "optimal" in names:
+        load_policy()  # solve the policy once here if it is missing, not in every worker
+
+    wins = {}
+    clocks = {name: [0, 0.0] for name in names}
+    start = time.perf_counter()
+    with Pool(processes) as pool:
+        for name1, name2, task_wins, _, clock1, clock2 in pool.imap_unordered(play_games, tasks):
+            wins[(name1, name2)] = wins.get((name1, name2), 0) + task_wins
+            for name, clock in [(name1, clock1), (name2, clock2)]:
+                clocks[name][0] += clock[0]
+                clocks[name][1] += clock[1]
+    total = time.perf_counter() - start
+
+    len1 = 20
+    nr_of_games = games * len(wins)
+    print(f"{nr_of_games} games in {round(total, 2)} s, {round(nr_of_games / total)} games/s "
+          f"({processes or os.cpu_count()} processes)")
+    for (name1, name2), pair_wins in wins.items():
+        low, high = confidence_interval(pair_wins, games)
+        print(f"{name1 + ' vs ' + name2 + ':': <{len1}} {name1} won {round(pair_wins * 100 / games, 2)}% "
+              f"[{round(low * 100, 2)}%, {round(high * 100, 2)}%]")
+    for name, (decisions, seconds) in clocks.items():
+        print(f"{name + ':': <{len1}} {decisions} decisions, {round(seconds / max(1, decisions) * 1e6, 2)} us each")
+    print()
+    return wins
+
+
+if __name__ == '__main__':
+    tournament(["dummy", "optimal"], games=100000)
+    tournament(["dummy", "optimal", "minimax"], games=2000, chunk=200)
@@ -0,0 +1,134 @@
+import statistics
+import time
+import tracemalloc
+
+import numpy as np
+
+from minesweeper_resolution_method import MineSweeperKb, ResolutionMethod, check_minesweeper_index
+from sat_solver import SatSolver
+
+
+def generate_board(height: int, width: int, density: float = 0.16, reveal: float = 0.4, seed: int = 0) -> tuple:
+    """Get (map, mine map) of a random board with the given share of mines, partially revealed.
+
+    Safe cells are clicked in random order, cells without mines around first, and clicks on them open
+    their neighbours like in the game, until the given share of all cells is revealed. map is in the
+    MineSweeperKb format, mine map marks mines with "*".
+    """
+    rng = np.random.default_rng(seed)
+    mines = rng.random((height, width)) < density
+    padded = np.pad(mines, 1).astype(np.int8)
+    numbers = sum(padded[1 + row:height + 1 + row, 1 + col:width + 1 + col]
+                  for row in (-1, 0, 1) for col in (-1, 0, 1)).tolist()
+    mine_rows = mines.tolist()
+
+    revealed = [[False] * width for _ in range(height)]
+    opened = 0
+    target = reveal * height * width
+    clicks = [divmod(int(index), width) for index in rng.permutation(height * width)]
+    clicks = [(row, col) for row, col in clicks if not mine_rows[row][col]]
+    clicks.sort(key=lambda cell: numbers[cell[0]][cell[1]] > 0)  # stable, zeros first
+    for click in clicks:
+        if opened >= target:
+            break
+        stack = [click]
+        while stack:
+            row, col = stack.pop()
+            if revealed[row][col]:
+                continue
+            revealed[row][col] = True
+            opened += 1
+            if numbers[row][col] == 0:
+                stack += [(r, c) for r in range(max(0, row - 1), min(height, row + 2))
+                          for c in range(max(0, col - 1), min(width, col + 2)) if not revealed[r][c]]
+
+    minesweeper_map = ["".join(str(numbers[row][col]) if revealed[row][col] else "." for col in range(width))
+                       for row in range(height)]
+    mine_map = ["".join("*" if mine_rows[row][col] else "." for col in range(width)) for row in range(height)]
+    return minesweeper_map, mine_map
+
+
+def frontier(minesweeper_map: list) -> list:
+    """Get indices of unrevealed cells next to a revealed number."""
+    height, width = len(minesweeper_map), len(minesweeper_map[0])
+    return [1 + col + row * width for row in range(height) for col in range(width)
+            if not minesweeper_map[row][col].isdigit()
+            and any(minesweeper_map[r][c].isdigit() for r in range(max(0, row - 1), min(height, row + 2))
+                    for c in range(max(0, col - 1), min(width, col + 2)))]
+
+
+def build(minesweeper_map: list, backend: str, encoding: str):
+    """Get kb and the backend built on it, like check_minesweeper_index does."""
+    kb = MineSweeperKb(minesweeper_map, encoding).kb
+    return kb, SatSolver(kb) if backend == "sat" else ResolutionMethod(kb)
+
+
+def query(method, alpha: int):
+    """Get True (mine), False (no mine) or None (not sure) with a built backend."""
+    if isinstance(method, SatSolver):
+        if not method.solve([-alpha], component_only=True):
+            return True
+        return False if not method.solve([alpha], component_only=True) else None
+    if method.resolution(-alpha, False):
+        return True
+    return False if method.resolution(alpha, False) else None
+
+
+def benchmark(sizes: list, configurations: list, density: float = 0.16, reveal: float = 0.4, queries: int = 20,
+              seed: int = 0):
+    """Print kb build time, clause count, memory and query latency of every (backend, encoding) on every size.
+
+    Queries go to random frontier cells of a board from generate_board, answers are checked against its mines.
+    Memory is the peak traced while building the kb and the backend, measured in a separate build.
+    The last column is one whole check_minesweeper_index call, which builds everything again.
+    """
+    len1 = 24
+    for height, width in sizes:
+        minesweeper_map, mine_map = generate_board(height, width, density, reveal, seed)
+        cells = frontier(minesweeper_map)
+        rng = np.random.default_rng(seed)
+        sample = [int(cell) for cell in rng.choice(cells, min(queries, len(cells)), replace=False)] if cells else []
+        mines = sum(row.count("*") for row in mine_map)
+        print(f"{height}x{width}: {mines} mines, {len(cells)} frontier cells, {len(sample)} queries")
+
+        for backend, encoding in configurations:
+            start = time.perf_counter()
+            kb, method = build(minesweeper_map, backend, encoding)
+            build_time = time.perf_counter() - start
+
+            tracemalloc.start()
+            build(minesweeper_map, backend, encoding)
+            memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            latencies = []
+            answers = {True: 0, False: 0, None: 0}
+            wrong = 0
+            for alpha in sample:
+                start = time.perf_counter()
+                answer = query(method, alpha)
+                latencies.append((time.perf_counter() - start) * 1000)
+                answers[answer] += 1
+                row, col = divmod(alpha - 1, width)
+                wrong += answer is not None and answer != (mine_map[row][col] == "*")
+
+            start = time.perf_counter()
+            if sample:
+                check_minesweeper_index(minesweeper_map, sample[0], backend=backend, encoding=encoding,
+                                        verbose=False)
+            call_time = time.perf_counter() - start
+
+            median = round(statistics.median(latencies), 3) if latencies else 0
+            print(f"{backend + '/' + encoding + ':': <{len1}} build {round(build_time * 1000, 1)} ms, "
+                  f"{len(kb)} clauses, {round(memory / 2 ** 10)} KiB, query median {median} ms, "
+                  f"max {round(max(latencies, default=0), 3)} ms, check_minesweeper_index "
+                  f"{round(call_time * 1000, 1)} ms")
+            print(f"{'': <{len1}} {answers[True]} mines, {answers[False]} no mines, {answers[None]} not sure, "
+                  f"{wrong} wrong")
+        print()
+
+
+if __name__ == '__main__':
+    benchmark([(8, 8), (16, 16)], [("resolution", "assignments"), ("resolution", "counter"),
+                                    ("sat", "assignments"), ("sat", "counter")])
+    benchmark([(32, 32), (100, 100), (250, 250), (500, 500)], [("sat", "assignments"), ("sat", "counter")])
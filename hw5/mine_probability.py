@@ -0,0 +1,349 @@
+import math
+import time
+
+import numpy as np
+
+
+def add_poly(table: dict, key, low: int, values: np.ndarray):
+    """Add polynomial values (coefficient k is values[k - low]) to table[key]."""
+    if key not in table:
+        table[key] = (low, values.copy())
+        return
+    old_low, old = table[key]
+    new_low = min(low, old_low)
+    high = max(low + len(values), old_low + len(old))
+    summed = np.zeros(high - new_low)
+    summed[old_low - new_low:old_low - new_low + len(old)] += old
+    summed[low - new_low:low - new_low + len(values)] += values
+    table[key] = (new_low, summed)
+
+
+def normalize(table: dict) -> float:
+    """Divide all polynomials of table by their largest value, returns log of it."""
+    largest = max(values.max() for _, values in table.values())
+    for key, (low, values) in table.items():
+        table[key] = (low, values / largest)
+    return math.log(largest)
+
+
+class ComponentCounts:
+
+    # Solutions of one connected component of number constraints, counted by their number of mines.
+    # Cells are ordered so that neighbouring cells come after each other. Going through the cells in that
+    # order, the state is the number of mines still missing from every constraint that has some cells before
+    # and some after the current cell, different assignments with the same state have the same completions.
+    # A forward pass counts assignments of the first i cells per state, a backward pass completions per state,
+    # their product gives the solutions with a cell being a mine. Polynomials are (lowest mine count, counts).
+
+    def __init__(self, constraints: frozenset):
+        """Class constructor."""
+        constraints = sorted(constraints, key=lambda constraint: (min(constraint[0]), constraint[1]))
+        self.cells = self.order_cells(constraints)
+        n = len(self.cells)
+        position = {cell: i for i, cell in enumerate(self.cells)}
+
+        positions = [sorted(position[cell] for cell in cells) for cells, _ in constraints]
+        self.required = [mines for _, mines in constraints]
+        self.cell_constraints = [[] for _ in range(n)]
+        self.after = [{} for _ in range(n)]  # cell -> {constraint: its cells after this cell}
+        for c, constraint_positions in enumerate(positions):
+            for k, i in enumerate(constraint_positions):
+                self.cell_constraints[i].append(c)
+                self.after[i][c] = len(constraint_positions) - k - 1
+        self.open = [[] for _ in range(n + 1)]  # constraints with cells before and after position i
+        for c, constraint_positions in enumerate(positions):
+            for i in range(constraint_positions[0] + 1, constraint_positions[-1] + 1):
+                self.open[i].append(c)
+        # for step: where the constraints of cell i and the next state come from in the state before cell i,
+        # -1 if the constraint starts at cell i
+        self.checks = []
+        self.layouts = []
+        for i in range(n):
+            in_state = {c: j for j, c in enumerate(self.open[i])}
+            self.checks.append([(in_state.get(c, -1), self.required[c], self.after[i][c])
+                                for c in self.cell_constraints[i]])
+            self.layouts.append([(in_state.get(c, -1), self.required[c], int(c in self.after[i]))
+                                 for c in self.open[i + 1]])
+        self.moves = [{} for _ in range(n)]  # state before cell i -> (state if no mine, state if mine)
+
+        self.states = 0
+        forward, forward_log = self.forward()
+        backward, backward_log = self.backward(forward)
+        if () not in backward[0]:
+            raise ValueError("revealed numbers contradict each other")
+        self.low, self.counts = backward[0][()]
+        self.log_scale = backward_log[0]
+
+        # mine_counts[i][m - low]: solutions with m mines where cell i is a mine, scaled like counts
+        self.mine_counts = np.zeros((n, len(self.counts)))
+        for i in range(n):
+            scale = math.exp(forward_log[i] + backward_log[i + 1] - self.log_scale)
+            for key, (low, values) in forward[i].items():
+                next_key = self.moves[i][key][1]
+                if next_key is None or next_key not in backward[i + 1]:
+                    continue
+                next_low, next_values = backward[i + 1][next_key]
+                start = low + next_low + 1 - self.low
+                product = np.convolve(values, next_values) * scale
+                self.mine_counts[i, start:start + len(product)] += product
+        self.moves = None  # only needed while counting
+
+    @staticmethod
+    def order_cells(constraints: list) -> list:
+        """Get cells in breadth first order over shared constraints.
+
+        The search starts from the last cell of a first search, an end of the frontier, so that the order
+        walks along the frontier instead of spreading to both sides of it.
+        """
+        by_cell = {}
+        for c, (cells, _) in enumerate(constraints):
+            for cell in cells:
+                by_cell.setdefault(cell, []).append(c)
+
+        def breadth_first(start: int) -> list:
+            order = [start]
+            seen = {start}
+            for cell in order:
+                for c in by_cell[cell]:
+                    for other in sorted(constraints[c][0]):
+                        if other not in seen:
+                            seen.add(other)
+                            order.append(other)
+            return order
+
+        return breadth_first(breadth_first(min(by_cell))[-1])
+
+    def step(self, i: int, state: tuple, mine: int):
+        """Get state after cell i is a mine (1) or not (0), None if that breaks a constraint."""
+        for j, required, after in self.checks[i]:
+            value = (state[j] if j >= 0 else required) - mine
+            if value < 0 or value > after:
+                return None
+        return tuple((state[j] if j >= 0 else required) - mine * has_cell for j, required, has_cell in self.layouts[i])
+
+    def forward(self) -> tuple:
+        tables = [{(): (0, np.ones(1))}]
+        logs = [0.0]
+        for i in range(len(self.cells)):
+            table = {}
+            moves = self.moves[i]
+            for key, (low, values) in tables[i].items():
+                moves[key] = (self.step(i, key, 0), self.step(i, key, 1))
+                for mine, next_key in enumerate(moves[key]):
+                    if next_key is not None:
+                        add_poly(table, next_key, low + mine, values)
+            if not table:
+                raise ValueError("revealed numbers contradict each other")
+            self.states += len(table)
+            logs.append(logs[-1] + normalize(table))
+            tables.append(table)
+        return tables, logs
+
+    def backward(self, forward: list) -> tuple:
+        n = len(self.cells)
+        tables = [{} for _ in range(n)] + [{(): (0, np.ones(1))}]
+        logs = [0.0] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            for key in forward[i]:
+                for mine, next_key in enumerate(self.moves[i][key]):
+                    if next_key in tables[i + 1]:
+                        low, values = tables[i + 1][next_key]
+                        add_poly(tables[i], key, low + mine, values)
+            logs[i] = logs[i + 1] + (normalize(tables[i]) if tables[i] else 0.0)
+        return tables, logs
+
+
+class MineProbabilities:
+
+    # Mine probability of every unrevealed cell when all placements of the board's mines that agree with the
+    # revealed numbers are equally likely. Numbers only constrain the frontier, which splits into components
+    # without shared constraints. Every component is counted by ComponentCounts, the rest of the mines are
+    # spread over the other unrevealed cells, so a placement with s frontier mines has C(interior, mines - s)
+    # equally likely interior completions. Components are cached by their constraints, a reveal only
+    # changes the constraints around it, so only the components those are in are counted again.
+
+    def __init__(self, minesweeper_map: list, mines: int):
+        """Class constructor."""
+        self.m_map = [list(row) for row in minesweeper_map]
+        self.height = len(self.m_map)
+        self.width = len(self.m_map[0])
+        self.mines = mines
+        self.unrevealed = sum(not col.isdigit() for row in self.m_map for col in row)
+        self.constraints = {}  # numbered cell -> (unrevealed neighbours, mines)
+        for row_i, row in enumerate(self.m_map):
+            for col_i, col in enumerate(row):
+                if col.isdigit():
+                    self.update_constraint(row_i, col_i)
+        self.cache = {}  # frozenset of constraints -> ComponentCounts
+        self.counted = 0  # components counted by the last probabilities() call
+
+    def index(self, row_i: int, col_i: int) -> int:
+        return 1 + col_i + row_i * self.width
+
+    def neighbors(self, row_i: int, col_i: int) -> list:
+        return [(row, col) for row in range(max(0, row_i - 1), min(self.height, row_i + 2))
+                for col in range(max(0, col_i - 1), min(self.width, col_i + 2)) if (row, col) != (row_i, col_i)]
+
+    def update_constraint(self, row_i: int, col_i: int):
+        cells = frozenset(self.index(row, col) for row, col in self.neighbors(row_i, col_i)
+                          if not self.m_map[row][col].isdigit())
+        if cells:
+            self.constraints[self.index(row_i, col_i)] = (cells, int(self.m_map[row_i][col_i]))
+        else:
+            self.constraints.pop(self.index(row_i, col_i), None)
+            if int(self.m_map[row_i][col_i]):
+                raise ValueError(f"({row_i}, {col_i}) needs mines but has no unrevealed neighbours")
+
+    def reveal(self, row_i: int, col_i: int, number: int):
+        """Reveal number at (row_i, col_i), only the constraints around it change."""
+        if self.m_map[row_i][col_i].isdigit():
+            raise ValueError(f"({row_i}, {col_i}) is already revealed")
+        self.m_map[row_i][col_i] = str(number)
+        self.unrevealed -= 1
+        for row, col in self.neighbors(row_i, col_i) + [(row_i, col_i)]:
+            if self.m_map[row][col].isdigit():
+                self.update_constraint(row, col)
+
+    def components(self) -> list:
+        """Get frozensets of constraints that share no cells with each other."""
+        parent = {}
+
+        def find(cell):
+            while parent[cell] != cell:
+                parent[cell] = parent[parent[cell]]
+                cell = parent[cell]
+            return cell
+
+        for cells, _ in self.constraints.values():
+            first = None
+            for cell in cells:
+                parent.setdefault(cell, cell)
+                if first is None:
+                    first = find(cell)
+                else:
+                    parent[find(cell)] = first
+        groups = {}
+        for constraint in set(self.constraints.values()):
+            groups.setdefault(find(next(iter(constraint[0]))), set()).add(constraint)
+        return [frozenset(group) for group in groups.values()]
+
+    def probabilities(self) -> tuple:
+        """Get ({frontier index: probability of a mine}, probability of a mine in any other unrevealed cell)."""
+        components = []
+        cache = {}
+        self.counted = 0
+        for constraints in self.components():
+            if constraints in self.cache:
+                counts = self.cache[constraints]
+            else:
+                counts = ComponentCounts(constraints)
+                self.counted += 1
+            cache[constraints] = counts
+            components.append(counts)
+        self.cache = cache  # components that are gone are dropped
+
+        frontier = sum(len(counts.cells) for counts in components)
+        interior = self.unrevealed - frontier
+        # every frontier mine is multiplied by q and every weight of s frontier mines divided by q^s, that
+        # changes nothing but keeps the products of counts and weights inside the range of floats
+        density = min(max(self.mines / max(self.unrevealed, 1), 1e-9), 1 - 1e-9)
+        log_q = math.log(density / (1 - density))
+        tilted = []
+        for counts in components:
+            m = np.arange(counts.low, counts.low + len(counts.counts))
+            with np.errstate(divide="ignore"):
+                log_tilted = np.log(counts.counts) + m * log_q
+            scale = np.exp(m * log_q - log_tilted.max())
+            tilted.append((counts.low, counts.counts * scale, counts.mine_counts * scale))
+
+        # weight of s frontier mines: log C(interior, mines - s) - s log q, -inf if impossible
+        s = np.arange(frontier + 1)
+        left = self.mines - s
+        possible = (left >= 0) & (left <= interior)
+        if not possible.any():
+            raise ValueError("the number of mines does not fit the board")
+        log_weights = np.full(frontier + 1, -np.inf)
+        log_weights[possible] = [math.lgamma(interior + 1) - math.lgamma(k + 1) - math.lgamma(interior - k + 1)
+                                 for k in left[possible]]
+        log_weights[possible] -= s[possible] * log_q
+        weights = np.exp(log_weights - log_weights.max())
+
+        # mine counts of all components but one, from prefix and suffix convolutions
+        prefixes = [(0, np.ones(1))]
+        for low, counts, _ in tilted:
+            previous_low, previous = prefixes[-1]
+            combined = np.convolve(previous, counts)
+            prefixes.append((previous_low + low, combined / combined.max()))
+        suffixes = [(0, np.ones(1))]
+        for low, counts, _ in reversed(tilted):
+            previous_low, previous = suffixes[-1]
+            combined = np.convolve(previous, counts)
+            suffixes.append((previous_low + low, combined / combined.max()))
+        suffixes.reverse()
+
+        total_low, total = prefixes[-1]
+        total_weights = weights[total_low:total_low + len(total)]
+        normalizer = total @ total_weights
+        if normalizer == 0:
+            raise ValueError("the number of mines does not fit the revealed numbers")
+        interior_mines = total @ (total_weights * (self.mines - np.arange(total_low, total_low + len(total))))
+        interior_probability = interior_mines / normalizer / interior if interior else 0.0
+
+        probabilities = {}
+        for k, (low, counts, mine_counts) in enumerate(tilted):
+            before_low, before = prefixes[k]
+            after_low, after = suffixes[k + 1]
+            others = np.convolve(before, after)
+            others_low = before_low + after_low
+            # weight of the component having low + j mines: sum over the others' mine counts
+            component_weights = np.array([others @ weights[others_low + m:others_low + m + len(others)]
+                                          for m in range(low, low + len(counts))])
+            total_weight = counts @ component_weights
+            for cell, cell_counts in zip(components[k].cells, mine_counts):
+                probabilities[cell] = float(cell_counts @ component_weights / total_weight)
+        return probabilities, float(interior_probability)
+
+
+def print_probabilities(minesweeper_map: list, mines: int):
+    """Print the map with mine probabilities (%) of the unrevealed cells."""
+    engine = MineProbabilities(minesweeper_map, mines)
+    probabilities, interior = engine.probabilities()
+    for row_i, row in enumerate(minesweeper_map):
+        print(" ".join(f"{col: >4}" if col.isdigit() else
+                       f"{round(probabilities.get(engine.index(row_i, col_i), interior) * 100): >3}%"
+                       for col_i, col in enumerate(row)))
+    print()
+
+
+def compare_reveals(mine_map: list, reveals: list):
+    """Reveal cells of a board ("*" marks mines) one by one and print how many components were counted."""
+    height, width = len(mine_map), len(mine_map[0])
+    mines = sum(row.count("*") for row in mine_map)
+    engine = MineProbabilities(["." * width] * height, mines)
+    len1 = 12
+    for row_i, col_i in reveals:
+        number = sum(mine_map[row][col] == "*" for row, col in engine.neighbors(row_i, col_i))
+        engine.reveal(row_i, col_i, number)
+        start = time.perf_counter()
+        probabilities, interior = engine.probabilities()
+        print(f"{str((row_i, col_i)) + ':': <{len1}} {len(engine.cache)} components, {engine.counted} counted, "
+              f"{len(probabilities)} frontier cells in {round((time.perf_counter() - start) * 1000, 2)} ms")
+    print()
+
+
+if __name__ == '__main__':
+    print_probabilities(["2.",
+                         ".."], 2)
+    print_probabilities(["....0",
+                         ".421.",
+                         ".100."], 4)
+    board = ["..*.....*.......",
+             "......*.........",
+             "*.........*...*.",
+             "...*............",
+             ".......*....*...",
+             ".*..........*...",
+             "........*.......",
+             "....*.........*.",
+             ]
+    compare_reveals(board, [(7, 0), (6, 0), (0, 0), (0, 4), (3, 6), (3, 13), (6, 11), (0, 14)])
@@ -1,5 +1,7 @@
 import heapq
 
+from sat_solver import SatSolver
+
 
 class MyHeap(object):
 
@@ -24,9 +26,25 @@ class MyHeap(object):
 
 class MineSweeperKb:
 
-    def __init__(self, minesweeper_map: list):
+    # encoding "assignments" has one clause for every wrong assignment of the unknown neighbors of a number,
+    # up to 256 clauses of length 8. encoding "counter" keeps "exactly k of these cells are mines" constraints:
+    # constraints with 0 or all mines become unit clauses and are removed from the other constraints first,
+    # equal constraints of different numbers are encoded once and the rest use a sequential counter with
+    # auxiliary variables numbered after the cells.
+
+    def __init__(self, minesweeper_map: list, encoding: str = "assignments"):
+        """Class constructor."""
         self.m_map = minesweeper_map
+        self.encoding = encoding
+        self.next_variable = 1 + len(minesweeper_map) * len(minesweeper_map[0])
+        self.known = {}  # cell -> True if it is a mine, False if not, as unit clauses in kb
+        self.constraints = set()  # (cells, mines) already in kb
         self.kb = []
+        if encoding == "counter":
+            self.kb = self.encode_constraints([(frozenset(self.get_unknown_indices(row_i, col_i)), int(col))
+                                               for row_i, row in enumerate(self.m_map)
+                                               for col_i, col in enumerate(row) if col.isdigit()])
+            return
         for row_i, row in enumerate(self.m_map):
             for col_i, col in enumerate(row):
                 if col.isdigit() and col != 0:
@@ -35,15 +53,16 @@ class MineSweeperKb:
     def generate_kb_for_spot(self, row_i: int, col_i: int) -> list:
         neighbors = self.get_unknown_indices(row_i, col_i)
         mines_nr = int(self.m_map[row_i][col_i])
+        if self.encoding == "counter":
+            return self.encode_constraints([(frozenset(neighbors), mines_nr)])
 
         n = len(neighbors)
         cnf = []
         for i in range(2 ** n):
-            binform = "{:0{n}b}".format(i, n=n)
             ones = 0
             clause = []
             for j in range(n):
-                if binform[j] == "1":
+                if i >> (n - 1 - j) & 1:
                     ones += 1
                     clause.append(-neighbors[j])
                 else:
@@ -52,6 +71,70 @@ class MineSweeperKb:
                 cnf.append(tuple(clause))
         return cnf
 
+    def reduce(self, cells: frozenset, mines: int) -> tuple:
+        """Get constraint without the known cells."""
+        known = [cell for cell in cells if cell in self.known]
+        if not known:
+            return cells, mines
+        return cells.difference(known), mines - sum(self.known[cell] for cell in known)
+
+    def encode_constraints(self, constraints: list) -> list:
+        cnf = []
+        changed = True
+        while changed:
+            changed = False
+            for cells, mines in constraints:
+                cells, mines = self.reduce(cells, mines)
+                if cells and mines in (0, len(cells)):
+                    for cell in cells:
+                        self.known[cell] = mines > 0
+                        cnf.append((cell,) if mines else (-cell,))
+                    changed = True
+        for cells, mines in constraints:
+            cells, mines = self.reduce(cells, mines)
+            if (cells, mines) in self.constraints:
+                continue
+            self.constraints.add((cells, mines))
+            if not 0 <= mines <= len(cells):
+                cnf.append(())  # contradicting numbers
+            elif cells:
+                cnf += self.exactly(sorted(cells), mines)
+        return cnf
+
+    def exactly(self, cells: list, mines: int) -> list:
+        """Get clauses saying that exactly mines of cells are mines, 0 < mines < len(cells).
+
+        Variable r[i][j] is true iff at least j of the first i + 1 cells are mines:
+        r[i][j] <-> r[i - 1][j] or (cell i and r[i - 1][j - 1]). Only the j values r[n - 1][mines] and
+        r[n - 1][mines + 1] depend on are made.
+        """
+        n = len(cells)
+        cnf = []
+        previous = {1: cells[0]}  # j -> literal of r[i - 1][j]
+        for i in range(1, n):
+            current = {}
+            cell = cells[i]
+            for j in range(max(1, mines - (n - 1 - i)), min(i + 1, mines + 1) + 1):
+                at_least = self.next_variable
+                self.next_variable += 1
+                current[j] = at_least
+                before = previous.get(j)  # missing: false, i cells can't hold j mines
+                below = previous.get(j - 1) if j > 1 else None  # missing when j == 1: true
+                if before is not None:
+                    cnf.append((-before, at_least))
+                if j == 1:
+                    cnf.append((-cell, at_least))
+                    cnf.append((-at_least, cell) if before is None else (-at_least, before, cell))
+                else:
+                    cnf.append((-cell, -below, at_least))
+                    cnf.append((-at_least, cell) if before is None else (-at_least, before, cell))
+                    cnf.append((-at_least, below) if before is None else (-at_least, before, below))
+            previous = current
+        cnf.append((previous[mines],))
+        if mines + 1 in previous:
+            cnf.append((-previous[mines + 1],))
+        return cnf
+
     def get_unknown_indices(self, row_i: int, col_i: int) -> list:
         unknowns = []
         map_height = len(self.m_map)
@@ -70,73 +153,171 @@ class MineSweeperKb:
         return unknowns
 
 
-class ResolutionMethod:
+class ClauseStore:
 
-    def __init__(self, kb):
-        self.kb = kb
+    # Clauses interned as frozensets. occurrences maps a literal to the ids of clauses containing it,
+    # so resolution partners of a clause are found from the occurrences of its complementary literals
+    # and subsumption candidates from the occurrences of its own literals. A 64 bit signature of every
+    # clause rules out most subset checks: if a is a subset of b, then signature(a) & ~signature(b) == 0.
+    # Changes are logged, so rollback() can bring the store back to the state of the last mark().
 
-    def resolution(self, alpha: int, debug: bool):
-        # alpha - literaal, mida tahame kontrollida. for example 9 or -9
-        processed = set()
-        candidates = MyHeap(set(self.kb.copy() + [tuple([alpha])]), key=len)
-
-        i = 0
-        while not candidates.is_empty():
-            candidate = candidates.pop()
-            if debug:
-                print(f"\nCurrent: {candidate} Candidates: {candidates.data}\nProcessed: {processed}")
-            subsumed = False
-            for p in processed:
-                if self.subsumes(candidate, p, debug):
-                    subsumed = True
-                    break
-            if subsumed:
-                continue
-            for p in processed:
-                resolvents = self.resolve(candidate, p, debug)
-                for r in resolvents:
-                    if len(r) == 0:
-                        return True
-                    candidates.push(tuple(sorted(r)))
-            processed.add(candidate)
+    def __init__(self, clauses=()):
+        """Class constructor."""
+        self.clauses = {}  # id -> frozenset
+        self.signatures = {}  # id -> signature
+        self.ids = {}  # frozenset -> id
+        self.occurrences = {}  # literal -> set of ids
+        self.next_id = 0
+        self.log = None
+        for clause in clauses:
+            self.add(frozenset(clause))
 
-            i += 1
-            if i > 200:
-                return False  # to stop endless loop in case of no contradiction found
-        return False
+    def __len__(self):
+        return len(self.clauses)
 
-    @staticmethod
-    def subsumes(clause: tuple, subset: tuple, debug: bool):
-        for i in clause:
-            if i not in subset:
-                return False
-        if debug:
-            print(f"{clause} subsumes {subset}")
-        return True
+    def __contains__(self, clause: frozenset):
+        return clause in self.ids
 
     @staticmethod
-    def resolve(clause1: tuple, clause2: tuple, debug: bool):
-        if debug:
-            print(f"Resolving {clause1} and {clause2}.. ", end="")
-        resolvents = set()
-        resolved = set()
-        for p in clause1:
-            if -p in clause2:
-                if p in resolved or -p in resolved:
+    def signature(clause) -> int:
+        signature = 0
+        for literal in clause:
+            signature |= 1 << (literal % 64)
+        return signature
+
+    def add(self, clause: frozenset) -> int:
+        """Add clause if it is not stored yet, returns its id."""
+        if clause in self.ids:
+            return self.ids[clause]
+        clause_id = self.next_id
+        self.next_id += 1
+        self.clauses[clause_id] = clause
+        self.signatures[clause_id] = self.signature(clause)
+        self.ids[clause] = clause_id
+        for literal in clause:
+            self.occurrences.setdefault(literal, set()).add(clause_id)
+        if self.log is not None:
+            self.log.append((True, clause_id, clause))
+        return clause_id
+
+    def remove(self, clause_id: int):
+        clause = self.clauses.pop(clause_id)
+        del self.signatures[clause_id]
+        del self.ids[clause]
+        for literal in clause:
+            self.occurrences[literal].discard(clause_id)
+        if self.log is not None:
+            self.log.append((False, clause_id, clause))
+
+    def mark(self):
+        self.log = []
+
+    def rollback(self):
+        """Undo every add and remove since mark()."""
+        log, self.log = self.log, None
+        for added, clause_id, clause in reversed(log):
+            if added:
+                self.next_id = clause_id
+                self.remove(clause_id)
+            else:
+                self.clauses[clause_id] = clause
+                self.signatures[clause_id] = self.signature(clause)
+                self.ids[clause] = clause_id
+                for literal in clause:
+                    self.occurrences.setdefault(literal, set()).add(clause_id)
+
+    def subsumer(self, clause: frozenset):
+        """Get a stored clause that is a subset of clause (forward subsumption), None if there is none."""
+        signature = self.signature(clause)
+        size = len(clause)
+        checked = set()
+        for literal in clause:
+            for clause_id in self.occurrences.get(literal, ()):
+                if clause_id in checked:
+                    continue
+                checked.add(clause_id)
+                other = self.clauses[clause_id]
+                if len(other) <= size and not self.signatures[clause_id] & ~signature and other <= clause:
+                    return other
+        return None
+
+    def subsumed(self, clause: frozenset) -> list:
+        """Get ids of stored clauses that clause is a subset of (backward subsumption)."""
+        if not clause:
+            return list(self.clauses)
+        signature = self.signature(clause)
+        size = len(clause)
+        # every such clause contains the rarest literal of clause
+        rarest = min(clause, key=lambda literal: len(self.occurrences.get(literal, ())))
+        return [clause_id for clause_id in self.occurrences.get(rarest, ())
+                if not signature & ~self.signatures[clause_id] and len(self.clauses[clause_id]) >= size
+                and clause <= self.clauses[clause_id]]
+
+    def resolvents(self, clause: frozenset):
+        """Yield (other clause, resolvent) for stored clauses with a complementary literal, without tautologies."""
+        for literal in clause:
+            rest = clause - {literal}
+            for clause_id in list(self.occurrences.get(-literal, ())):
+                other = self.clauses[clause_id]
+                resolvent = rest | (other - {-literal})
+                if not ResolutionMethod.is_tautology(resolvent):
+                    yield other, resolvent
+
+
+class ResolutionMethod:
+
+    # Given clause algorithm with a set of support: kb is assumed consistent, so every refutation can use
+    # the goal clause or a clause derived from it. Candidates are those clauses, shortest first, and they
+    # are resolved only against clauses of the indexed store holding kb and the already processed candidates.
+    # Subsumed candidates are dropped and processed clauses that a new clause subsumes are removed.
+
+    def __init__(self, kb):
+        """Class constructor."""
+        self.kb = kb
+        self.store = ClauseStore(clause for clause in kb if not self.is_tautology(clause))
+        for clause in sorted(self.store.clauses.values(), key=len):
+            if clause in self.store:
+                for clause_id in self.store.subsumed(clause):
+                    if self.store.clauses[clause_id] != clause:
+                        self.store.remove(clause_id)
+
+    def resolution(self, alpha: int, debug: bool, max_steps: int = None):
+        # alpha - literaal, mida tahame kontrollida. for example 9 or -9
+        # max_steps - optional limit of processed candidates, saturation always ends without it
+        candidates = MyHeap(key=len)
+        candidates.push(frozenset([alpha]))
+        generated = {frozenset([alpha])}
+        self.store.mark()
+        try:
+            i = 0
+            while not candidates.is_empty():
+                candidate = candidates.pop()
+                if debug:
+                    print(f"\nCurrent: {sorted(candidate)} Candidates: {len(candidates.data)} "
+                          f"Processed: {len(self.store)}")
+                subsumer = self.store.subsumer(candidate)
+                if subsumer is not None:
+                    if debug:
+                        print(f"{sorted(subsumer)} subsumes {sorted(candidate)}")
                     continue
-                resolved.add(p)
-                temp = list(clause1 + clause2)
-                while p in temp:
-                    temp.remove(p)
-                while -p in temp:
-                    temp.remove(-p)
-                resolvents.add(tuple(set(temp)))
-        temp = sorted(set(clause1 + clause2))
-        if len(resolvents) == 0 and temp != sorted(clause1) and temp != sorted(clause2):
-            resolvents.add(tuple(temp))
-        if debug:
-            print(f"Resolvents: {resolvents}")
-        return resolvents
+                for other, resolvent in self.store.resolvents(candidate):
+                    if debug:
+                        print(f"Resolving {sorted(candidate)} and {sorted(other)}: {sorted(resolvent)}")
+                    if not resolvent:
+                        return True
+                    if resolvent not in generated:
+                        generated.add(resolvent)
+                        candidates.push(resolvent)
+                for clause_id in self.store.subsumed(candidate):
+                    self.store.remove(clause_id)
+                self.store.add(candidate)
+
+                i += 1
+                if max_steps is not None and i >= max_steps:
+                    return False
+            return False
+        finally:
+            self.store.rollback()
 
     @staticmethod
     def is_tautology(clause: set):
@@ -146,46 +327,66 @@ class ResolutionMethod:
         return False
 
 
-def check_minesweeper_index(minesweeper_map: list, alpha: int, debug: bool = False):
-    print(f"Index: {alpha}, Map: {minesweeper_map}")
-    minesweeper = MineSweeperKb(minesweeper_map)
+def check_minesweeper_index(minesweeper_map: list, alpha: int, debug: bool = False, backend: str = "resolution",
+                            encoding: str = "assignments", verbose: bool = True):
+    """Print if there is a mine at index alpha, returns True (mine), False (no mine) or None (not sure).
+
+    backend "resolution" uses ResolutionMethod, "sat" asks SatSolver if the component of alpha in the kb stays
+    satisfiable with the opposite assumption, which always gives an exact answer. encoding is passed to MineSweeperKb.
+    Nothing is printed if verbose is False.
+    """
+    log = print if verbose else lambda *args, **kwargs: None
+    log(f"Index: {alpha}, Map: {minesweeper_map}")
+    minesweeper = MineSweeperKb(minesweeper_map, encoding)
     knowledge_base = minesweeper.kb
-    print(f"kb: {knowledge_base}")
-    resolution_method = ResolutionMethod(knowledge_base)
+    log(f"kb: {knowledge_base}")
+    if backend == "sat":
+        solver = SatSolver(knowledge_base)
 
-    is_mine = resolution_method.resolution(-alpha, debug)
-    print(f"is mine: {is_mine}")
+        def refutes(literal: int) -> bool:
+            return not solver.solve([literal], component_only=True)
+    else:
+        resolution_method = ResolutionMethod(knowledge_base)
+
+        def refutes(literal: int) -> bool:
+            return resolution_method.resolution(literal, debug)
+
+    is_mine = refutes(-alpha)
+    log(f"is mine: {is_mine}")
     if is_mine:
-        print("Mine exists\n")
+        log("Mine exists\n")
+        return True
     else:
-        is_not_mine = resolution_method.resolution(alpha, debug)
-        print(f"is not mine: {is_not_mine}")
+        is_not_mine = refutes(alpha)
+        log(f"is not mine: {is_not_mine}")
 
         if not is_mine and not is_not_mine:
-            print("Not sure... Unable to resolve\n")
+            log("Not sure... Unable to resolve\n")
+            return None
         else:
-            print("No mine\n")
+            log("No mine\n")
+            return False
 
 
-def check_all_cases():
+def check_all_cases(backend: str = "resolution"):
     l1 = ["2.", ".."]
-    check_minesweeper_index(l1, 2, True)  # not sure
+    check_minesweeper_index(l1, 2, True, backend)  # not sure
 
     l2 = ["110",
           ".1.",
           "110"]
-    check_minesweeper_index(l2, 4)  # yes
-    check_minesweeper_index(l2, 6)  # no
+    check_minesweeper_index(l2, 4, backend=backend)  # yes
+    check_minesweeper_index(l2, 6, backend=backend)  # no
 
     l3 = ["000.",
           "1211",
           "...."]
-    check_minesweeper_index(l3, 9)  # yes
+    check_minesweeper_index(l3, 9, backend=backend)  # yes
 
     l4 = ["....0",
           ".421.",
           ".100."]
-    check_minesweeper_index(l4, 1)  # yes
+    check_minesweeper_index(l4, 1, backend=backend)  # yes
 
 
 if __name__ == '__main__':
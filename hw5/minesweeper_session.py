@@ -0,0 +1,164 @@
+import time
+
+from minesweeper_resolution_method import MineSweeperKb, check_minesweeper_index
+from sat_solver import SatSolver
+
+
+class MineSweeperSession:
+
+    # One SatSolver for the whole game. Revealing a cell only adds clauses (the cell is no mine and the
+    # constraint of its number), so everything the solver has learned and every known mine or safe cell
+    # stays true after it. Every satisfying assignment the solver finds shows a possible value of all
+    # frontier cells, a cell is only asked about with the value no model has given it yet.
+
+    def __init__(self, minesweeper_map: list, encoding: str = "counter"):
+        """Class constructor."""
+        self.m_map = [list(row) for row in minesweeper_map]
+        self.height = len(self.m_map)
+        self.width = len(self.m_map[0])
+        # the kb builder reads the same, mutable map
+        self.minesweeper = MineSweeperKb(self.m_map, encoding)
+        self.solver = SatSolver(self.minesweeper.kb)
+        self.mines = set()  # indices known to be mines
+        self.safe = set()  # unrevealed indices known to be no mines
+        self.frontier = set()  # unrevealed indices next to a revealed number
+        for row_i, row in enumerate(self.m_map):
+            for col_i, col in enumerate(row):
+                if col.isdigit():
+                    self.frontier.update(self.minesweeper.get_unknown_indices(row_i, col_i))
+
+    def index(self, row_i: int, col_i: int) -> int:
+        return 1 + col_i + row_i * self.width
+
+    def position(self, index: int) -> tuple:
+        return divmod(index - 1, self.width)
+
+    def reveal(self, row_i: int, col_i: int, number: int):
+        """Reveal number at (row_i, col_i), only its new clauses are added to the solver."""
+        if self.m_map[row_i][col_i].isdigit():
+            raise ValueError(f"({row_i}, {col_i}) is already revealed")
+        index = self.index(row_i, col_i)
+        self.m_map[row_i][col_i] = str(number)
+        self.minesweeper.known[index] = False
+        self.solver.add_clause([-index])
+        for clause in self.minesweeper.generate_kb_for_spot(row_i, col_i):
+            self.solver.add_clause(clause)
+        self.safe.discard(index)
+        self.frontier.discard(index)
+        self.frontier.update(self.minesweeper.get_unknown_indices(row_i, col_i))
+
+    def learn(self, index: int, is_mine: bool):
+        (self.mines if is_mine else self.safe).add(index)
+        self.minesweeper.known[index] = is_mine
+        self.solver.add_clause([index if is_mine else -index])
+
+    def classify(self, index: int):
+        """Get True (mine), False (no mine) or None (not sure) for an unrevealed index."""
+        if index in self.mines:
+            return True
+        if index in self.safe:
+            return False
+        if not self.solver.solve([-index], component_only=True):
+            self.learn(index, True)
+            return True
+        if not self.solver.solve([index], component_only=True):
+            self.learn(index, False)
+            return False
+        return None
+
+    def classify_all_frontier(self) -> dict:
+        """Get {index: True (mine), False (no mine) or None (not sure)} of every frontier cell."""
+        if not self.solver.solve():
+            raise ValueError("revealed numbers contradict each other")
+        frontier = sorted(self.frontier)
+        values = {index: {self.solver.model[index]} for index in frontier}
+        for index in frontier:
+            if index in self.mines or index in self.safe or len(values[index]) == 2:
+                continue
+            # the opposite of the only value seen so far
+            opposite = -index if 1 in values[index] else index
+            if self.solver.solve([opposite]):
+                model = self.solver.model
+                for other in frontier:
+                    values[other].add(model[other])
+            else:
+                self.learn(index, 1 in values[index])
+        return {index: True if index in self.mines else False if index in self.safe else None
+                for index in frontier}
+
+
+def play(mine_map: list, start: tuple = None, debug: bool = False) -> tuple:
+    """Play a board, "*" marks mines in mine_map, revealing safe cells of classify_all_frontier until stuck.
+
+    The first cell revealed is start, by default the first one without mines around it.
+    Returns (revealed cells, safe cells).
+    """
+    height, width = len(mine_map), len(mine_map[0])
+
+    def number(row_i: int, col_i: int) -> int:
+        return sum(mine_map[r][c] == "*" for r in range(max(0, row_i - 1), min(height, row_i + 2))
+                   for c in range(max(0, col_i - 1), min(width, col_i + 2)))
+
+    session = MineSweeperSession(["." * width] * height)
+    if start is None:
+        start = next((r, c) for r in range(height) for c in range(width)
+                     if mine_map[r][c] != "*" and not number(r, c))
+    to_reveal = [start]
+    revealed = 0
+    while to_reveal:
+        for row_i, col_i in to_reveal:
+            if session.m_map[row_i][col_i] == ".":
+                session.reveal(row_i, col_i, number(row_i, col_i))
+                revealed += 1
+        classified = session.classify_all_frontier()
+        to_reveal = [session.position(index) for index, is_mine in classified.items() if is_mine is False]
+        if debug:
+            print("\n".join("".join(row) for row in session.m_map) + "\n")
+    safe = sum(cell != "*" for row in mine_map for cell in row)
+    return revealed, safe
+
+
+def compare_with_queries(minesweeper_map: list):
+    """Compare classify_all_frontier with two check_minesweeper_index queries per frontier cell."""
+    start = time.perf_counter()
+    session = MineSweeperSession(minesweeper_map)
+    classified = session.classify_all_frontier()
+    session_time = time.perf_counter() - start
+    conflicts = session.solver.conflicts
+
+    start = time.perf_counter()
+    same = 0
+    for index, expected in classified.items():
+        same += check_minesweeper_index(minesweeper_map, index, backend="sat", verbose=False) == expected
+    queries_time = time.perf_counter() - start
+    len1 = 24
+    print(f"{'Frontier cells:': <{len1}} {len(classified)}, mines {list(classified.values()).count(True)}, "
+          f"safe {list(classified.values()).count(False)}, not sure {list(classified.values()).count(None)}")
+    print(f"{'classify_all_frontier:': <{len1}} {round(session_time * 1000, 2)} ms ({conflicts} conflicts)")
+    print(f"{'check_minesweeper_index:': <{len1}} {round(queries_time * 1000, 2)} ms, {same} same answers\n")
+
+
+if __name__ == '__main__':
+    board = ["..*.....*.......",
+             "......*.........",
+             "*.........*...*.",
+             "...*............",
+             ".......*....*...",
+             ".*..........*...",
+             "........*.......",
+             "....*.........*.",
+             "..........*.....",
+             ".*..*...........",
+             ".........*...*..",
+             "...*............",
+             "......*.....*...",
+             "*...............",
+             ".....*....*....*",
+             "..*.............",
+             ]
+    start = time.perf_counter()
+    revealed, safe = play(board, start=(15, 8))
+    print(f"Revealed {revealed}/{safe} safe cells in {round(time.perf_counter() - start, 4)} s\n")
+    compare_with_queries(["....0",
+                          ".421.",
+                          ".100."])
@@ -0,0 +1,316 @@
+import heapq
+
+
+class SatSolver:
+
+    # CDCL solver: two watched literals per clause, unit propagation, first-UIP clause learning,
+    # VSIDS-like variable activity with saved phases and Luby restarts.
+    # clauses are lists of DIMACS style literals (variable v true is v, false is -v), the first two
+    # literals of a clause are its watches. solve() takes assumptions, so one solver answers many
+    # queries on the same knowledge base and keeps what it learned between them.
+    # variables sharing a clause are in one component (learned clauses never join two of them), a query
+    # that only needs the answer decides the variables of its own component and leaves the rest unassigned.
+
+    def __init__(self, clauses=(), restart_base: int = 100):
+        """Class constructor."""
+        self.clauses = []
+        self.watches = {}  # literal -> indices of clauses watching it
+        self.assigns = [0]  # variable -> 1 true, -1 false, 0 unassigned
+        self.level = [0]
+        self.reason = [None]
+        self.activity = [0.0]
+        self.phase = [-1]  # saved polarity, unknown cells are guessed to be no mines first
+        self.used = [False]  # variables ids are cell indices, only the ones in clauses are decided
+        self.order = []  # heap of (-activity, variable), may hold stale entries
+        self.parent = [0]  # union-find over variables, a root stands for its component
+        self.members = {}  # component root -> its used variables
+        self.deciding = None  # variables of the components searched by solve(component_only=True)
+        self.trail = []
+        self.trail_lim = []  # trail length at the start of every decision level
+        self.queue_head = 0
+        self.bump = 1.0
+        self.restart_base = restart_base
+        self.ok = True  # False once the clauses are known to be unsatisfiable
+        self.model = None  # assigns of the last satisfying assignment found
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def add_variable(self, variable: int) -> None:
+        """Grow the per-variable lists up to variable and mark it as used, so it gets decided."""
+        if variable >= len(self.assigns):
+            grow = variable + 1 - len(self.assigns)
+            self.assigns += [0] * grow
+            self.level += [0] * grow
+            self.reason += [None] * grow
+            self.activity += [0.0] * grow
+            self.phase += [-1] * grow
+            self.used += [False] * grow
+            self.parent += range(len(self.parent), variable + 1)
+        if not self.used[variable]:
+            self.used[variable] = True
+            self.members[variable] = [variable]
+            heapq.heappush(self.order, (-self.activity[variable], variable))
+
+    def find(self, variable: int) -> int:
+        """Get root of the component of variable."""
+        parent = self.parent
+        while parent[variable] != variable:
+            parent[variable] = parent[parent[variable]]
+            variable = parent[variable]
+        return variable
+
+    def union(self, variables) -> None:
+        """Join the components of variables."""
+        members = self.members
+        root = self.find(variables[0])
+        for variable in variables[1:]:
+            other = self.find(variable)
+            if other == root:
+                continue
+            if len(members[root]) < len(members[other]):
+                root, other = other, root
+            self.parent[other] = root
+            members[root] += members.pop(other)
+
+    def value(self, literal: int) -> int:
+        """Get 1 if literal is true, -1 if false and 0 if unassigned."""
+        return self.assigns[literal] if literal > 0 else -self.assigns[-literal]
+
+    def add_clause(self, clause) -> bool:
+        """Add clause, returns False if the clauses became unsatisfiable. Only called between searches."""
+        if not self.ok:
+            return False
+        clause = set(clause)
+        # every variable is registered before the early returns, so assigns and model cover all of them
+        for literal in clause:
+            self.add_variable(abs(literal))
+        literals = []
+        for literal in clause:
+            if -literal in literals:
+                return True  # tautology
+            value = self.value(literal)
+            if value == 1:
+                return True  # already satisfied at level 0
+            if value == 0:
+                literals.append(literal)
+        if not literals:
+            self.ok = False
+        elif len(literals) == 1:
+            self.enqueue(literals[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.attach(literals)
+            self.union([abs(literal) for literal in literals])
+        return self.ok
+
+    def attach(self, literals: list) -> int:
+        """Store clause of at least two literals and watch its first two, returns its index."""
+        self.clauses.append(literals)
+        index = len(self.clauses) - 1
+        self.watches.setdefault(literals[0], []).append(index)
+        self.watches.setdefault(literals[1], []).append(index)
+        return index
+
+    def enqueue(self, literal: int, reason) -> None:
+        """Make literal true on the current level, reason is the index of the implying clause or None."""
+        variable = abs(literal)
+        self.assigns[variable] = 1 if literal > 0 else -1
+        self.level[variable] = len(self.trail_lim)
+        self.reason[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """Propagate assignments on the trail, returns index of a conflicting clause or None."""
+        assigns = self.assigns
+        clauses = self.clauses
+        watches = self.watches
+        while self.queue_head < len(self.trail):
+            false_literal = -self.trail[self.queue_head]
+            self.queue_head += 1
+            self.propagations += 1
+            watchers = watches.get(false_literal)
+            if not watchers:
+                continue
+            kept = []
+            for position, index in enumerate(watchers):
+                clause = clauses[index]
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], false_literal
+                first = clause[0]
+                first_value = assigns[first] if first > 0 else -assigns[-first]
+                if first_value == 1:
+                    kept.append(index)
+                    continue
+                for k in range(2, len(clause)):
+                    literal = clause[k]
+                    if (assigns[literal] if literal > 0 else -assigns[-literal]) != -1:
+                        clause[1], clause[k] = literal, false_literal
+                        watches.setdefault(literal, []).append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if first_value == -1:
+                        kept.extend(watchers[position + 1:])
+                        watches[false_literal] = kept
+                        return index
+                    self.enqueue(first, index)
+            watches[false_literal] = kept
+        return None
+
+    def analyze(self, conflict: int) -> tuple:
+        """Get first-UIP learned clause (asserting literal first) and the level to jump back to."""
+        learned = [0]
+        seen = set()
+        counter = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = self.clauses[conflict]
+        current_level = len(self.trail_lim)
+        while True:
+            for other in clause:
+                variable = abs(other)
+                if other == literal or variable in seen or self.level[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump_activity(variable)
+                if self.level[variable] == current_level:
+                    counter += 1
+                else:
+                    learned.append(other)
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self.clauses[self.reason[abs(literal)]]
+        learned[0] = -literal
+
+        back_level = 0
+        if len(learned) > 1:
+            # the second watch must be the literal of the highest remaining level
+            deepest = max(range(1, len(learned)), key=lambda i: self.level[abs(learned[i])])
+            learned[1], learned[deepest] = learned[deepest], learned[1]
+            back_level = self.level[abs(learned[1])]
+        self.bump *= 1.05
+        return learned, back_level
+
+    def bump_activity(self, variable: int) -> None:
+        """Raise activity of a variable seen in a conflict, rescaling all of them before they overflow."""
+        self.activity[variable] += self.bump
+        if self.activity[variable] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.bump *= 1e-100
+            variables = range(len(self.activity)) if self.deciding is None else self.deciding
+            self.order = [(-self.activity[v], v) for v in variables if self.used[v] and not self.assigns[v]]
+            heapq.heapify(self.order)
+        elif not self.assigns[variable]:
+            heapq.heappush(self.order, (-self.activity[variable], variable))
+
+    def backtrack(self, level: int) -> None:
+        """Undo assignments above level, saving their phases and putting their variables back in the heap."""
+        if len(self.trail_lim) <= level:
+            return
+        start = self.trail_lim[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phase[variable] = 1 if literal > 0 else -1
+            self.assigns[variable] = 0
+            self.reason[variable] = None
+            heapq.heappush(self.order, (-self.activity[variable], variable))
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.queue_head = len(self.trail)
+
+    def pick_branch_variable(self) -> int:
+        """Get unassigned variable with the highest activity, 0 if all are assigned."""
+        while self.order:
+            _, variable = heapq.heappop(self.order)
+            if not self.assigns[variable]:
+                return variable
+        return 0
+
+    @staticmethod
+    def luby(i: int) -> int:
+        """Get i-th (from 0) element of the Luby sequence 1, 1, 2, 1, 1, 2, 4, ..."""
+        size, power = 1, 0
+        while size < i + 1:
+            power += 1
+            size = 2 * size + 1
+        while size - 1 != i:
+            size = (size - 1) // 2
+            power -= 1
+            i %= size
+        return 2 ** power
+
+    def solve(self, assumptions=(), component_only: bool = False) -> bool:
+        """Check if clauses and assumption literals can all be true, learned clauses are kept afterwards.
+
+        If they can, model holds the satisfying assignment (1 true, -1 false for every variable).
+        With component_only only the components of the assumptions are searched, so the work does not grow
+        with the rest of the clauses, which must be satisfiable on their own. model is 0 outside of them.
+        """
+        if not self.ok:
+            return False
+        for literal in assumptions:
+            self.add_variable(abs(literal))
+        order = self.order
+        if component_only:
+            # every unassigned variable keeps its entry in the full heap, a separate one is searched
+            roots = {self.find(abs(literal)) for literal in assumptions}
+            self.deciding = [variable for root in roots for variable in self.members[root]]
+            self.order = [(-self.activity[v], v) for v in self.deciding if not self.assigns[v]]
+            heapq.heapify(self.order)
+        restarts = 0
+        conflicts_left = self.restart_base * self.luby(restarts)
+        try:
+            while True:
+                conflict = self.propagate()
+                if conflict is not None:
+                    self.conflicts += 1
+                    if not self.trail_lim:
+                        self.ok = False
+                        return False
+                    learned, back_level = self.analyze(conflict)
+                    self.backtrack(back_level)
+                    if len(learned) == 1:
+                        self.enqueue(learned[0], None)
+                    else:
+                        self.enqueue(learned[0], self.attach(learned))
+                    conflicts_left -= 1
+                    continue
+
+                if conflicts_left <= 0:
+                    restarts += 1
+                    conflicts_left = self.restart_base * self.luby(restarts)
+                    self.backtrack(0)
+                    continue
+
+                # assumptions are the first decisions, one level each
+                level = len(self.trail_lim)
+                if level < len(assumptions):
+                    literal = assumptions[level]
+                    value = self.value(literal)
+                    if value == -1:
+                        return False
+                    self.trail_lim.append(len(self.trail))
+                    if value == 0:
+                        self.enqueue(literal, None)
+                    continue
+
+                variable = self.pick_branch_variable()
+                if not variable:
+                    self.model = self.assigns[:]
+                    return True
+                self.decisions += 1
+                self.trail_lim.append(len(self.trail))
+                self.enqueue(variable * self.phase[variable], None)
+        finally:
+            self.backtrack(0)
+            if component_only:
+                self.order = order
+                self.deciding = None